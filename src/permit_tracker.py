@@ -5,16 +5,19 @@ Handles permit applications, approvals/denials, expiry, compliance checks,
 CSV export, and reminder notifications. SQLite-backed.
 """
 import argparse
+import atexit
 import csv
 import io
 import json
+import os
 import sqlite3
 import sys
-import uuid
-from dataclasses import dataclass, asdict
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterator
 
 DB_PATH = Path.home() / ".blackroad" / "permits.db"
 
@@ -25,10 +28,13 @@ PERMIT_TYPES = (
     "business_license", "home_occupation", "variance", "other",
 )
 
+# Hashed lookup for validation; the tuple above keeps its order for argparse.
+_PERMIT_TYPES_SET = frozenset(PERMIT_TYPES)
+
 
 # ── Dataclasses ──────────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Permit:
     id: str
     permit_type: str
@@ -49,9 +55,18 @@ class Permit:
             self.created_at, self.updated_at, self.notes,
         )
 
+    def to_dict(self) -> dict:
+        # Permit is flat, so this shallow copy matches dataclasses.asdict()
+        # without its recursive deepcopy.
+        return {f: getattr(self, f) for f in self.__dataclass_fields__}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
     @classmethod
     def from_row(cls, row) -> "Permit":
-        return cls(**dict(row))
+        # Rows are always selected as _PERMIT_COLUMNS, which follows field order.
+        return cls(*row)
 
     @property
     def is_expired(self) -> bool:
@@ -62,13 +77,184 @@ class Permit:
 
 # ── Database ─────────────────────────────────────────────────────────────────
 
+# One long-lived connection per database file; the schema is created when the
+# connection is first opened and the connection is reused for every call.
+_CONN_CACHE: Dict[Path, sqlite3.Connection] = {}
+# Separate read-only connections for the query-only API functions.
+_RO_CONN_CACHE: Dict[Path, sqlite3.Connection] = {}
+_CONN_LOCK = threading.Lock()
+
+
+class _WriterConnection(sqlite3.Connection):
+    """
+    The cached writer connection is shared by every thread, so its `with`
+    blocks take a lock: one thread's transaction cannot interleave with,
+    commit or roll back another's.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._tx_lock = threading.RLock()
+
+    def __enter__(self):
+        self._tx_lock.acquire()
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        try:
+            return super().__exit__(*exc_info)
+        finally:
+            self._tx_lock.release()
+
+
+# Applied once per connection. WAL keeps readers from blocking the writer and,
+# with synchronous=NORMAL, avoids an fsync on every commit. Note that WAL mode
+# creates "-wal" and "-shm" sidecar files next to the database.
+_READ_PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+)
+_PRAGMAS = ("PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL") + _READ_PRAGMAS
+
+# Hot statements are module-level constants so every call hands sqlite3 the
+# same text and hits its per-connection statement cache. Permit rows are read
+# with an explicit column list in Permit field order (see Permit.from_row):
+# the table also carries generated *_ts columns.
+_PERMIT_COLUMNS = (
+    "id, permit_type, applicant, address, description, status, "
+    "issued_at, expires_at, created_at, updated_at, notes"
+)
+_SQL_SELECT_BY_ID = f"SELECT {_PERMIT_COLUMNS} FROM permits WHERE id=?"
+_SQL_SELECT_STATUS = "SELECT status FROM permits WHERE id=?"
+_SQL_SELECT_REMINDER = (
+    "SELECT permit_type, applicant, address, status, expires_at, expires_at_ts "
+    "FROM permits WHERE id=?"
+)
+_SQL_INSERT_PERMIT = f"INSERT INTO permits ({_PERMIT_COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?,?,?)"
+_SQL_INSERT_EVENT = "INSERT INTO permit_events VALUES (?,?,?,?,?,?)"
+_SQL_APPROVE = (
+    "UPDATE permits SET status='approved', issued_at=?, expires_at=?, updated_at=?, notes=? "
+    f"WHERE id=? AND status='pending' RETURNING {_PERMIT_COLUMNS}"
+)
+_SQL_DENY = (
+    "UPDATE permits SET status='denied', updated_at=?, notes=? "
+    f"WHERE id=? AND status='pending' RETURNING {_PERMIT_COLUMNS}"
+)
+_SQL_EXPIRE = f"UPDATE permits SET status='expired', updated_at=? WHERE id=? RETURNING {_PERMIT_COLUMNS}"
+# Pinned to the partial expiry index: left to itself the planner prefers the
+# status equality on idx_permits_status and then filters every approved row.
+_SQL_EXPIRE_OVERDUE = (
+    "UPDATE permits INDEXED BY idx_permits_expiry SET status='expired', updated_at=? "
+    "WHERE status='approved' AND expires_at_ts < ? "
+    "RETURNING id"
+)
+_SQL_EXPIRING_BETWEEN = (
+    "SELECT id FROM permits INDEXED BY idx_permits_expiry "
+    "WHERE status='approved' AND expires_at_ts >= ? AND expires_at_ts < ? ORDER BY expires_at_ts"
+)
+_SQL_SEARCH_ADDRESS = (
+    "SELECT " + ", ".join("p." + c for c in _PERMIT_COLUMNS.split(", ")) + " "
+    "FROM permits p JOIN permits_fts f ON p.rowid = f.rowid "
+    "WHERE permits_fts MATCH ? ORDER BY p.created_at DESC"
+)
+_SQL_SEARCH_ADDRESS_LIKE = f"SELECT {_PERMIT_COLUMNS} FROM permits WHERE address LIKE ? ORDER BY created_at DESC"
+_SQL_LIST = f"SELECT {_PERMIT_COLUMNS} FROM permits ORDER BY created_at DESC"
+_SQL_LIST_BY_STATUS = f"SELECT {_PERMIT_COLUMNS} FROM permits WHERE status=? ORDER BY created_at DESC"
+_SQL_EXPORT = f"SELECT {_PERMIT_COLUMNS} FROM permits ORDER BY created_at"
+_SQL_EXPORT_BY_STATUS = f"SELECT {_PERMIT_COLUMNS} FROM permits WHERE status=? ORDER BY created_at"
+
+# Compliance rules as (SQL predicate, issue message), evaluated in one pass
+# into a bitmask: bit i is set when rule i fails. Only rows with a non-zero
+# mask are decoded in Python. Messages may reference {status}/{permit_type}.
+# SQL trim() strips only spaces by default; it is given every character
+# str.strip() treats as whitespace so blank-field checks agree with Python.
+_WHITESPACE_SQL = "char(%s)" % ", ".join(str(i) for i in range(0x3001) if chr(i).isspace())
+_COMPLIANCE_RULES = (
+    (f"trim(coalesce(address, ''), {_WHITESPACE_SQL}) = ''",
+     "MISSING_ADDRESS: Permit has no address."),
+    (f"trim(coalesce(applicant, ''), {_WHITESPACE_SQL}) = ''",
+     "MISSING_APPLICANT: Permit has no applicant name."),
+    ("status NOT IN (%s)" % ", ".join(f"'{s}'" for s in VALID_STATUSES),
+     "INVALID_STATUS: '{status}' is not a valid status."),
+    ("status = 'approved' AND coalesce(issued_at, '') = ''",
+     "MISSING_ISSUED_AT: Approved permit has no issue date."),
+    ("status = 'approved' AND coalesce(expires_at, '') = ''",
+     "MISSING_EXPIRES_AT: Approved permit has no expiry date."),
+    ("status = 'approved' AND expires_at_ts < :now",
+     "OVERDUE_EXPIRY: Permit is past expiry but still marked approved."),
+    ("permit_type NOT IN (%s)" % ", ".join(f"'{t}'" for t in PERMIT_TYPES),
+     "UNKNOWN_TYPE: '{permit_type}' is not a recognised permit type."),
+)
+_COMPLIANCE_SELECT = "SELECT id, status, permit_type, %s AS flags FROM permits" % " | ".join(
+    f"(coalesce({pred}, 0) << {bit})" for bit, (pred, _) in enumerate(_COMPLIANCE_RULES)
+)
+_SQL_COMPLIANCE_ONE = _COMPLIANCE_SELECT + " WHERE id = :id"
+_SQL_COMPLIANCE_ALL = f"SELECT * FROM ({_COMPLIANCE_SELECT}) WHERE flags != 0 ORDER BY id"
+
+# ISO-8601 timestamp columns mirrored as integer Unix-epoch seconds. These are
+# virtual generated columns, so every writer (including ad-hoc SQL) keeps them
+# in sync, and range filters compare integers instead of parsing text.
+_EPOCH_COLUMNS = ("issued_at", "expires_at", "created_at", "updated_at")
+
+
 def get_db(path: Path = DB_PATH) -> sqlite3.Connection:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(path))
-    conn.row_factory = sqlite3.Row
+    conn = _CONN_CACHE.get(path)
+    if conn is not None:
+        return conn
+    with _CONN_LOCK:
+        conn = _CONN_CACHE.get(path)
+        if conn is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(path), check_same_thread=False, cached_statements=256,
+                factory=_WriterConnection,
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
+            init_db(conn)
+            _CONN_CACHE[path] = conn
+    return conn
+
+
+def get_db_ro(path: Path = DB_PATH) -> Optional[sqlite3.Connection]:
+    """
+    Return a cached read-only connection, or None if the database does not
+    exist yet. Reads through it never take the write lock or run DDL.
+    """
+    conn = _RO_CONN_CACHE.get(path)
+    if conn is not None:
+        return conn
+    if not path.exists():
+        return None
+    get_db(path)  # bring an older schema up to date once per process
+    with _CONN_LOCK:
+        conn = _RO_CONN_CACHE.get(path)
+        if conn is None:
+            conn = sqlite3.connect(
+                path.resolve().as_uri() + "?mode=ro", uri=True,
+                check_same_thread=False, cached_statements=256,
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in _READ_PRAGMAS:
+                conn.execute(pragma)
+            _RO_CONN_CACHE[path] = conn
     return conn
 
 
+def close_all() -> None:
+    """Close every cached connection (registered to run at interpreter exit)."""
+    with _CONN_LOCK:
+        for cache in (_RO_CONN_CACHE, _CONN_CACHE):
+            for conn in cache.values():
+                conn.close()
+            cache.clear()
+
+
+atexit.register(close_all)
+
+
 def init_db(conn: sqlite3.Connection) -> None:
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS permits (
@@ -97,16 +283,86 @@ def init_db(conn: sqlite3.Connection) -> None:
             occurred_at TEXT NOT NULL,
             FOREIGN KEY(permit_id) REFERENCES permits(id)
         );
+        CREATE INDEX IF NOT EXISTS idx_events_permit
+            ON permit_events(permit_id);
+    """)
+    _add_epoch_columns(conn)
+    conn.executescript("""
+        DROP INDEX IF EXISTS idx_permits_sweep;
+        CREATE INDEX IF NOT EXISTS idx_permits_expiry
+            ON permits(expires_at_ts) WHERE status='approved';
     """)
     conn.commit()
+    _init_address_fts(conn)
+
 
+def _add_epoch_columns(conn: sqlite3.Connection) -> None:
+    """Add any missing <column>_ts generated columns (new and pre-existing tables)."""
+    present = {r["name"] for r in conn.execute("PRAGMA table_xinfo(permits)")}
+    for col in _EPOCH_COLUMNS:
+        if f"{col}_ts" not in present:
+            conn.execute(
+                f"ALTER TABLE permits ADD COLUMN {col}_ts INTEGER "
+                f"GENERATED ALWAYS AS (CAST(strftime('%s', {col}) AS INTEGER)) VIRTUAL"
+            )
 
-def _log_event(conn: sqlite3.Connection, permit_id: str,
-               event_type: str, actor: str = "system", message: str = "") -> None:
+
+def _init_address_fts(conn: sqlite3.Connection) -> None:
+    """Create the FTS5 address index and its sync triggers, if FTS5 is available."""
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='permits_fts'"
+    ).fetchone()
+    try:
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS permits_fts
+                USING fts5(address, content='permits', content_rowid='rowid');
+            CREATE TRIGGER IF NOT EXISTS permits_fts_ai AFTER INSERT ON permits BEGIN
+                INSERT INTO permits_fts(rowid, address) VALUES (new.rowid, new.address);
+            END;
+            CREATE TRIGGER IF NOT EXISTS permits_fts_ad AFTER DELETE ON permits BEGIN
+                INSERT INTO permits_fts(permits_fts, rowid, address)
+                VALUES ('delete', old.rowid, old.address);
+            END;
+            CREATE TRIGGER IF NOT EXISTS permits_fts_au AFTER UPDATE OF address ON permits BEGIN
+                INSERT INTO permits_fts(permits_fts, rowid, address)
+                VALUES ('delete', old.rowid, old.address);
+                INSERT INTO permits_fts(rowid, address) VALUES (new.rowid, new.address);
+            END;
+        """)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5: get_permits_by_address falls back to LIKE.
+        return
+    if not existed:
+        # Index permits written before the FTS table existed.
+        with conn:
+            conn.execute("INSERT INTO permits_fts(permits_fts) VALUES ('rebuild')")
+
+
+def _current_status(conn: sqlite3.Connection, permit_id: str) -> str:
+    """Return a permit's status, raising ValueError if it does not exist."""
+    row = conn.execute(_SQL_SELECT_STATUS, (permit_id,)).fetchone()
+    if not row:
+        raise ValueError(f"Permit '{permit_id}' not found.")
+    return row["status"]
+
+
+def _new_id() -> str:
+    """Return a random 10-hex-character ID."""
+    return os.urandom(5).hex()
+
+
+def _new_ids(n: int) -> List[str]:
+    """Return `n` random IDs like _new_id(), drawn from a single urandom call."""
+    buf = os.urandom(5 * n)
+    return [buf[i:i + 5].hex() for i in range(0, 5 * n, 5)]
+
+
+def _log_event(conn: sqlite3.Connection, permit_id: str, event_type: str,
+               actor: str, message: str, occurred_at: str) -> None:
+    """Record an event; `occurred_at` is the timestamp written to the permit row."""
     conn.execute(
-        "INSERT INTO permit_events VALUES (?,?,?,?,?,?)",
-        (str(uuid.uuid4())[:8], permit_id, event_type, actor, message,
-         datetime.now(timezone.utc).isoformat()),
+        _SQL_INSERT_EVENT,
+        (_new_id(), permit_id, event_type, actor, message, occurred_at),
     )
 
 
@@ -121,11 +377,11 @@ def apply(
     db_path: Path = DB_PATH,
 ) -> Permit:
     """Submit a new permit application."""
-    if permit_type not in PERMIT_TYPES:
+    if permit_type not in _PERMIT_TYPES_SET:
         raise ValueError(f"Unknown permit type '{permit_type}'. Valid: {PERMIT_TYPES}")
     now = datetime.now(timezone.utc).isoformat()
     permit = Permit(
-        id=str(uuid.uuid4())[:10],
+        id=_new_id(),
         permit_type=permit_type,
         applicant=applicant,
         address=address,
@@ -138,14 +394,38 @@ def apply(
         notes="",
     )
     conn = get_db(db_path)
-    init_db(conn)
-    conn.execute("INSERT INTO permits VALUES (?,?,?,?,?,?,?,?,?,?,?)", permit.to_row())
-    _log_event(conn, permit.id, "applied", applicant, f"Applied for {permit_type} permit")
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute(_SQL_INSERT_PERMIT, permit.to_row())
+        _log_event(conn, permit.id, "applied", applicant, f"Applied for {permit_type} permit", now)
     return permit
 
 
+def bulk_apply(records: List[dict], db_path: Path = DB_PATH) -> List[str]:
+    """
+    Submit many applications in one transaction. Each record needs
+    permit_type, applicant and address keys (description is optional).
+    Every record is validated before anything is written. Returns the new IDs.
+    """
+    unknown = sorted({r["permit_type"] for r in records} - _PERMIT_TYPES_SET)
+    if unknown:
+        raise ValueError(f"Unknown permit type(s) {unknown}. Valid: {PERMIT_TYPES}")
+    now = datetime.now(timezone.utc).isoformat()
+    ids = _new_ids(len(records))
+    event_ids = _new_ids(len(records))
+    conn = get_db(db_path)
+    with conn:
+        conn.executemany(_SQL_INSERT_PERMIT, [
+            (pid, r["permit_type"], r["applicant"], r["address"], r.get("description", ""),
+             "pending", None, None, now, now, "")
+            for pid, r in zip(ids, records)
+        ])
+        conn.executemany(_SQL_INSERT_EVENT, [
+            (eid, pid, "applied", r["applicant"], f"Applied for {r['permit_type']} permit", now)
+            for eid, pid, r in zip(event_ids, ids, records)
+        ])
+    return ids
+
+
 def approve(
     permit_id: str,
     actor: str = "admin",
@@ -155,25 +435,16 @@ def approve(
 ) -> Permit:
     """Approve a pending permit and set its validity window."""
     conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute("SELECT * FROM permits WHERE id=?", (permit_id,)).fetchone()
-    if not row:
-        raise ValueError(f"Permit '{permit_id}' not found.")
-    p = Permit.from_row(row)
-    if p.status != "pending":
-        raise ValueError(f"Permit '{permit_id}' is '{p.status}', not pending.")
     now = datetime.now(timezone.utc)
     issued = now.isoformat()
     expires = (now + timedelta(days=validity_days)).isoformat()
-    conn.execute(
-        "UPDATE permits SET status='approved', issued_at=?, expires_at=?, updated_at=?, notes=? WHERE id=?",
-        (issued, expires, issued, notes, permit_id),
-    )
-    _log_event(conn, permit_id, "approved", actor, notes or "Permit approved")
-    conn.commit()
-    updated = Permit.from_row(conn.execute("SELECT * FROM permits WHERE id=?", (permit_id,)).fetchone())
-    conn.close()
-    return updated
+    with conn:
+        row = conn.execute(_SQL_APPROVE, (issued, expires, issued, notes, permit_id)).fetchone()
+        if not row:
+            status = _current_status(conn, permit_id)
+            raise ValueError(f"Permit '{permit_id}' is '{status}', not pending.")
+        _log_event(conn, permit_id, "approved", actor, notes or "Permit approved", issued)
+    return Permit.from_row(row)
 
 
 def deny(
@@ -184,114 +455,104 @@ def deny(
 ) -> Permit:
     """Deny a pending permit."""
     conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute("SELECT * FROM permits WHERE id=?", (permit_id,)).fetchone()
-    if not row:
-        raise ValueError(f"Permit '{permit_id}' not found.")
-    p = Permit.from_row(row)
-    if p.status not in ("pending",):
-        raise ValueError(f"Permit '{permit_id}' cannot be denied (status: {p.status}).")
     now = datetime.now(timezone.utc).isoformat()
-    conn.execute(
-        "UPDATE permits SET status='denied', updated_at=?, notes=? WHERE id=?",
-        (now, reason, permit_id),
-    )
-    _log_event(conn, permit_id, "denied", actor, reason)
-    conn.commit()
-    updated = Permit.from_row(conn.execute("SELECT * FROM permits WHERE id=?", (permit_id,)).fetchone())
-    conn.close()
-    return updated
+    with conn:
+        row = conn.execute(_SQL_DENY, (now, reason, permit_id)).fetchone()
+        if not row:
+            status = _current_status(conn, permit_id)
+            raise ValueError(f"Permit '{permit_id}' cannot be denied (status: {status}).")
+        _log_event(conn, permit_id, "denied", actor, reason, now)
+    return Permit.from_row(row)
 
 
 def expire_permit(permit_id: str, actor: str = "system", db_path: Path = DB_PATH) -> Permit:
     """Manually mark a permit as expired."""
     conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute("SELECT * FROM permits WHERE id=?", (permit_id,)).fetchone()
-    if not row:
-        raise ValueError(f"Permit '{permit_id}' not found.")
     now = datetime.now(timezone.utc).isoformat()
-    conn.execute(
-        "UPDATE permits SET status='expired', updated_at=? WHERE id=?",
-        (now, permit_id),
-    )
-    _log_event(conn, permit_id, "expired", actor, "Permit expired")
-    conn.commit()
-    updated = Permit.from_row(conn.execute("SELECT * FROM permits WHERE id=?", (permit_id,)).fetchone())
-    conn.close()
-    return updated
+    with conn:
+        row = conn.execute(_SQL_EXPIRE, (now, permit_id)).fetchone()
+        if not row:
+            raise ValueError(f"Permit '{permit_id}' not found.")
+        _log_event(conn, permit_id, "expired", actor, "Permit expired", now)
+    return Permit.from_row(row)
 
 
 def expire_overdue(db_path: Path = DB_PATH) -> List[str]:
     """Auto-expire all approved permits past their expires_at date. Returns IDs."""
     conn = get_db(db_path)
-    init_db(conn)
-    now = datetime.now(timezone.utc).isoformat()
-    rows = conn.execute(
-        "SELECT id FROM permits WHERE status='approved' AND expires_at IS NOT NULL AND expires_at < ?",
-        (now,),
-    ).fetchall()
-    expired_ids = [r["id"] for r in rows]
-    for pid in expired_ids:
-        conn.execute(
-            "UPDATE permits SET status='expired', updated_at=? WHERE id=?", (now, pid)
+    now_ts = time.time()
+    now = datetime.fromtimestamp(now_ts, timezone.utc).isoformat()
+    with conn:
+        expired_ids = [r["id"] for r in conn.execute(_SQL_EXPIRE_OVERDUE, (now, int(now_ts))).fetchall()]
+        conn.executemany(
+            _SQL_INSERT_EVENT,
+            [(eid, pid, "auto_expired", "system", "Auto-expired by system sweep", now)
+             for eid, pid in zip(_new_ids(len(expired_ids)), expired_ids)],
         )
-        _log_event(conn, pid, "auto_expired", "system", "Auto-expired by system sweep")
-    conn.commit()
-    conn.close()
     return expired_ids
 
 
 def get_permits_by_address(address: str, db_path: Path = DB_PATH) -> List[Permit]:
-    """Return all permits associated with an address (partial match)."""
-    conn = get_db(db_path)
-    init_db(conn)
-    rows = conn.execute(
-        "SELECT * FROM permits WHERE address LIKE ? ORDER BY created_at DESC",
-        (f"%{address}%",),
-    ).fetchall()
-    conn.close()
+    """Return all permits associated with an address (word-prefix match)."""
+    conn = get_db_ro(db_path)
+    if conn is None:
+        return []
+    rows = None
+    if any(ch.isalnum() for ch in address):
+        # Quote the input as one FTS5 phrase and prefix-match its last word.
+        term = '"' + address.replace('"', '""') + '"*'
+        try:
+            rows = conn.execute(_SQL_SEARCH_ADDRESS, (term,)).fetchall()
+        except sqlite3.OperationalError:
+            pass  # SQLite built without FTS5
+    if rows is None:
+        rows = conn.execute(_SQL_SEARCH_ADDRESS_LIKE, (f"%{address}%",)).fetchall()
     return [Permit.from_row(r) for r in rows]
 
 
+def _compliance_result(row: sqlite3.Row, checked_at: str) -> dict:
+    flags = row["flags"]
+    issues = [
+        message.format(status=row["status"], permit_type=row["permit_type"])
+        for bit, (_, message) in enumerate(_COMPLIANCE_RULES)
+        if flags >> bit & 1
+    ]
+    return {
+        "permit_id": row["id"],
+        "status": row["status"],
+        "compliant": not issues,
+        "issues": issues,
+        "checked_at": checked_at,
+    }
+
+
 def check_compliance(permit_id: str, db_path: Path = DB_PATH) -> dict:
     """
     Run a compliance check on a permit. Returns issues list and overall pass/fail.
     Checks: status validity, expiry, required fields.
     """
-    conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute("SELECT * FROM permits WHERE id=?", (permit_id,)).fetchone()
-    conn.close()
+    conn = get_db_ro(db_path)
+    now = time.time()
+    row = conn.execute(
+        _SQL_COMPLIANCE_ONE, {"id": permit_id, "now": int(now)}
+    ).fetchone() if conn else None
     if not row:
         raise ValueError(f"Permit '{permit_id}' not found.")
-    p = Permit.from_row(row)
-
-    issues = []
-
-    if not p.address.strip():
-        issues.append("MISSING_ADDRESS: Permit has no address.")
-    if not p.applicant.strip():
-        issues.append("MISSING_APPLICANT: Permit has no applicant name.")
-    if p.status not in VALID_STATUSES:
-        issues.append(f"INVALID_STATUS: '{p.status}' is not a valid status.")
-    if p.status == "approved":
-        if not p.issued_at:
-            issues.append("MISSING_ISSUED_AT: Approved permit has no issue date.")
-        if not p.expires_at:
-            issues.append("MISSING_EXPIRES_AT: Approved permit has no expiry date.")
-        if p.is_expired and p.status != "expired":
-            issues.append("OVERDUE_EXPIRY: Permit is past expiry but still marked approved.")
-    if p.permit_type not in PERMIT_TYPES:
-        issues.append(f"UNKNOWN_TYPE: '{p.permit_type}' is not a recognised permit type.")
+    return _compliance_result(row, datetime.fromtimestamp(now, timezone.utc).isoformat())
 
-    return {
-        "permit_id": permit_id,
-        "status": p.status,
-        "compliant": len(issues) == 0,
-        "issues": issues,
-        "checked_at": datetime.now(timezone.utc).isoformat(),
-    }
+
+def bulk_compliance(db_path: Path = DB_PATH) -> List[dict]:
+    """
+    Check every permit in one query. Returns check_compliance()-style
+    results for the non-compliant permits only, ordered by permit ID.
+    """
+    conn = get_db_ro(db_path)
+    if conn is None:
+        return []
+    now = time.time()
+    checked_at = datetime.fromtimestamp(now, timezone.utc).isoformat()
+    return [_compliance_result(r, checked_at)
+            for r in conn.execute(_SQL_COMPLIANCE_ALL, {"now": int(now)})]
 
 
 def send_reminder(
@@ -301,73 +562,88 @@ def send_reminder(
     Check if a permit expires within `days_before` days.
     Returns reminder payload if so, else None.
     """
-    conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute("SELECT * FROM permits WHERE id=?", (permit_id,)).fetchone()
-    conn.close()
+    conn = get_db_ro(db_path)
+    row = conn.execute(_SQL_SELECT_REMINDER, (permit_id,)).fetchone() if conn else None
     if not row:
         raise ValueError(f"Permit '{permit_id}' not found.")
-    p = Permit.from_row(row)
-    if not p.expires_at or p.status != "approved":
+    if row["expires_at_ts"] is None or row["status"] != "approved":
         return None
-    deadline = datetime.fromisoformat(p.expires_at)
-    if deadline.tzinfo is None:
-        deadline = deadline.replace(tzinfo=timezone.utc)
-    now = datetime.now(timezone.utc)
-    delta = (deadline - now).days
+    delta = (row["expires_at_ts"] - int(time.time())) // 86400
     if 0 <= delta <= days_before:
         return {
             "permit_id": permit_id,
-            "applicant": p.applicant,
-            "address": p.address,
-            "expires_at": p.expires_at,
+            "applicant": row["applicant"],
+            "address": row["address"],
+            "expires_at": row["expires_at"],
             "days_remaining": delta,
             "message": (
-                f"REMINDER: Your {p.permit_type} permit at {p.address} "
+                f"REMINDER: Your {row['permit_type']} permit at {row['address']} "
                 f"expires in {delta} day(s). Please renew."
             ),
         }
     return None
 
 
-def export_csv(db_path: Path = DB_PATH, status: Optional[str] = None) -> str:
-    """Export all (or filtered) permits as CSV."""
-    conn = get_db(db_path)
-    init_db(conn)
-    if status:
-        rows = conn.execute("SELECT * FROM permits WHERE status=? ORDER BY created_at", (status,)).fetchall()
-    else:
-        rows = conn.execute("SELECT * FROM permits ORDER BY created_at").fetchall()
-    conn.close()
+def send_reminders_bulk(days_before: int = 30, db_path: Path = DB_PATH) -> List[str]:
+    """
+    Return IDs of all approved permits expiring within `days_before` days,
+    soonest first — the same window send_reminder() applies to one permit.
+    """
+    conn = get_db_ro(db_path)
+    if conn is None:
+        return []
+    now_ts = int(time.time())
+    # (deadline - now) // 1 day <= days_before  <=>  deadline < now + days_before + 1 days
+    window_end = now_ts + (days_before + 1) * 86400
+    rows = conn.execute(_SQL_EXPIRING_BETWEEN, (now_ts, window_end)).fetchall()
+    return [r["id"] for r in rows]
+
+
+def export_csv_iter(
+    db_path: Path = DB_PATH, status: Optional[str] = None, chunk_rows: int = 1000
+) -> Iterator[str]:
+    """Stream all (or filtered) permits as CSV text, `chunk_rows` rows per chunk."""
+    conn = get_db_ro(db_path)
     out = io.StringIO()
     w = csv.writer(out)
     w.writerow(["id", "permit_type", "applicant", "address", "description",
                 "status", "issued_at", "expires_at", "created_at", "updated_at", "notes"])
-    for r in rows:
-        w.writerow([r["id"], r["permit_type"], r["applicant"], r["address"],
-                    r["description"], r["status"], r["issued_at"], r["expires_at"],
-                    r["created_at"], r["updated_at"], r["notes"]])
-    return out.getvalue()
+    if conn is not None:
+        if status:
+            cur = conn.execute(_SQL_EXPORT_BY_STATUS, (status,))
+        else:
+            cur = conn.execute(_SQL_EXPORT)
+        while True:
+            rows = cur.fetchmany(chunk_rows)
+            if not rows:
+                break
+            w.writerows(rows)
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue()  # header only: no permits matched
+
+
+def export_csv(db_path: Path = DB_PATH, status: Optional[str] = None) -> str:
+    """Export all (or filtered) permits as CSV."""
+    return "".join(export_csv_iter(db_path, status))
 
 
 def get_permit(permit_id: str, db_path: Path = DB_PATH) -> Optional[Permit]:
-    conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute("SELECT * FROM permits WHERE id=?", (permit_id,)).fetchone()
-    conn.close()
+    conn = get_db_ro(db_path)
+    row = conn.execute(_SQL_SELECT_BY_ID, (permit_id,)).fetchone() if conn else None
     return Permit.from_row(row) if row else None
 
 
 def list_permits(status: Optional[str] = None, db_path: Path = DB_PATH) -> List[Permit]:
-    conn = get_db(db_path)
-    init_db(conn)
+    conn = get_db_ro(db_path)
+    if conn is None:
+        return []
     if status:
-        rows = conn.execute(
-            "SELECT * FROM permits WHERE status=? ORDER BY created_at DESC", (status,)
-        ).fetchall()
+        rows = conn.execute(_SQL_LIST_BY_STATUS, (status,)).fetchall()
     else:
-        rows = conn.execute("SELECT * FROM permits ORDER BY created_at DESC").fetchall()
-    conn.close()
+        rows = conn.execute(_SQL_LIST).fetchall()
     return [Permit.from_row(r) for r in rows]
 
 
@@ -376,23 +652,23 @@ def list_permits(status: Optional[str] = None, db_path: Path = DB_PATH) -> List[
 def cmd_apply(args):
     p = apply(args.type, args.applicant, args.address,
               args.description or "", int(args.validity_days or 365))
-    print(json.dumps(asdict(p), indent=2))
+    print(p.to_json())
 
 
 def cmd_approve(args):
     p = approve(args.permit_id, args.actor or "admin",
                 args.notes or "", int(args.validity_days or 365))
-    print(json.dumps(asdict(p), indent=2))
+    print(p.to_json())
 
 
 def cmd_deny(args):
     p = deny(args.permit_id, args.reason, args.actor or "admin")
-    print(json.dumps(asdict(p), indent=2))
+    print(p.to_json())
 
 
 def cmd_expire(args):
     p = expire_permit(args.permit_id)
-    print(json.dumps(asdict(p), indent=2))
+    print(p.to_json())
 
 
 def cmd_sweep(args):
@@ -425,12 +701,13 @@ def cmd_reminder(args):
 
 
 def cmd_export(args):
-    output = export_csv(status=args.status or None)
+    chunks = export_csv_iter(status=args.status or None)
     if args.output:
-        Path(args.output).write_text(output)
+        with open(args.output, "w") as fh:
+            fh.writelines(chunks)
         print(f"✅ Exported to {args.output}")
     else:
-        print(output)
+        sys.stdout.writelines(chunks)
 
 
 def cmd_list(args):
@@ -450,7 +727,7 @@ def cmd_show(args):
     if not p:
         print(f"Permit '{args.permit_id}' not found.", file=sys.stderr)
         sys.exit(1)
-    print(json.dumps(asdict(p), indent=2))
+    print(p.to_json())
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -528,9 +805,38 @@ def build_parser() -> argparse.ArgumentParser:
     return p
 
 
-def main() -> None:
-    parser = build_parser()
-    args = parser.parse_args()
+# Subcommand -> (handler, positional names, option defaults). When argv is just
+# a known subcommand and its positionals, main() builds the namespace directly
+# and skips constructing the full parser; options, --help, typos and wrong
+# arity all fall through to argparse. Defaults must mirror build_parser().
+_FAST_COMMANDS = {
+    "approve": (cmd_approve, ("permit_id",), {"actor": "admin", "notes": "", "validity_days": 365}),
+    "deny": (cmd_deny, ("permit_id", "reason"), {"actor": "admin"}),
+    "expire": (cmd_expire, ("permit_id",), {}),
+    "sweep": (cmd_sweep, (), {}),
+    "search": (cmd_search_address, ("address",), {}),
+    "compliance": (cmd_compliance, ("permit_id",), {}),
+    "reminder": (cmd_reminder, ("permit_id",), {"days": 30}),
+    "export": (cmd_export, (), {"status": None, "output": None}),
+    "list": (cmd_list, (), {"status": None}),
+    "show": (cmd_show, ("permit_id",), {}),
+}
+
+
+def _fast_args(argv: List[str]) -> Optional[argparse.Namespace]:
+    spec = _FAST_COMMANDS.get(argv[0]) if argv else None
+    if spec is None:
+        return None
+    func, names, defaults = spec
+    values = argv[1:]
+    if len(values) != len(names) or any(v.startswith("-") for v in values):
+        return None
+    return argparse.Namespace(command=argv[0], func=func, **defaults, **dict(zip(names, values)))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    args = _fast_args(argv) or build_parser().parse_args(argv)
     try:
         args.func(args)
     except (ValueError, RuntimeError) as exc:
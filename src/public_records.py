@@ -5,17 +5,20 @@ Supports publishing, searching, retracting, exporting document bundles,
 and tracking FOIA requests. SQLite-backed.
 """
 import argparse
+import atexit
 import csv
+import functools
 import io
 import json
 import sqlite3
 import sys
+import threading
 import uuid
 import zipfile
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 DB_PATH = Path.home() / ".blackroad" / "public_records.db"
 
@@ -26,10 +29,17 @@ VALID_CATEGORIES = (
 )
 FOIA_STATUSES = ("open", "processing", "fulfilled", "denied", "withdrawn")
 
+# Hashed lookup for validation; the tuple above keeps its order for argparse.
+_VALID_CATEGORIES_SET = frozenset(VALID_CATEGORIES)
+
+# Applied to titles when naming bundle members; path separators would
+# otherwise create nested directories inside the ZIP.
+_FILENAME_TRANS = str.maketrans({" ": "_", "/": "_", "\\": "_"})
+
 
 # ── Dataclasses ──────────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class Document:
     id: str
     title: str
@@ -49,17 +59,25 @@ class Document:
             int(self.is_public), self.version,
         )
 
+    def to_dict(self) -> dict:
+        # Fields are all scalars, so this shallow copy matches dataclasses.asdict()
+        # without its recursive deepcopy.
+        return {f: getattr(self, f) for f in self.__dataclass_fields__}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
     @classmethod
     def from_row(cls, row) -> "Document":
-        d = dict(row)
-        d["is_public"] = bool(d["is_public"])
-        return cls(**d)
+        # Rows are always selected as _DOC_COLUMNS, which follows field order.
+        return cls(row[0], row[1], row[2], row[3], row[4],
+                   row[5], row[6], row[7], bool(row[8]), row[9])
 
     def tag_list(self) -> List[str]:
         return [t.strip() for t in self.tags.split(",") if t.strip()]
 
 
-@dataclass
+@dataclass(slots=True)
 class FoiaRequest:
     id: str
     requester: str
@@ -76,21 +94,197 @@ class FoiaRequest:
             self.created_at, self.updated_at, self.response, self.document_ids,
         )
 
+    def to_dict(self) -> dict:
+        return {f: getattr(self, f) for f in self.__dataclass_fields__}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
     @classmethod
     def from_row(cls, row) -> "FoiaRequest":
-        return cls(**dict(row))
+        # Rows are always selected as _FOIA_COLUMNS, which follows field order.
+        return cls(*row)
 
 
 # ── Database ─────────────────────────────────────────────────────────────────
 
+# One long-lived connection per database file; the schema is created when the
+# connection is first opened and the connection is reused for every call.
+_CONN_CACHE: Dict[Path, sqlite3.Connection] = {}
+_CONN_LOCK = threading.Lock()
+
+
+class _WriterConnection(sqlite3.Connection):
+    """
+    The cached writer connection is shared by every thread, so its `with`
+    blocks take a lock: one thread's transaction cannot interleave with,
+    commit or roll back another's.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._tx_lock = threading.RLock()
+
+    def __enter__(self):
+        self._tx_lock.acquire()
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        try:
+            return super().__exit__(*exc_info)
+        finally:
+            self._tx_lock.release()
+
+
+# Applied once per connection. WAL keeps readers from blocking the writer and,
+# with synchronous=NORMAL, avoids an fsync on every commit. The larger page
+# cache also covers the FTS shadow tables. Note that WAL mode creates "-wal"
+# and "-shm" sidecar files next to the database.
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+)
+
+# Stored in PRAGMA user_version once init_db has brought a database up to
+# date. Bump it whenever init_db gains a schema change.
+_SCHEMA_VERSION = 3
+
+# Hot statements are module-level constants so every call hands sqlite3 the
+# same text and hits its per-connection statement cache. Rows are read with
+# explicit column lists in dataclass field order (see the from_row methods).
+_DOC_COLUMNS = "id, title, category, body, tags, author, created_at, updated_at, is_public, version"
+_FOIA_COLUMNS = "id, requester, description, status, created_at, updated_at, response, document_ids"
+_SQL_SELECT_DOC = f"SELECT {_DOC_COLUMNS} FROM documents WHERE id=?"
+_SQL_SELECT_PUBLIC_DOC = f"SELECT {_DOC_COLUMNS} FROM documents WHERE id=? AND is_public=1"
+_SQL_INSERT_DOC = "INSERT INTO documents VALUES (?,?,?,?,?,?,?,?,?,?)"
+_SQL_PUBLISH = f"UPDATE documents SET is_public=1, updated_at=? WHERE id=? RETURNING {_DOC_COLUMNS}"
+_SQL_RETRACT = f"UPDATE documents SET is_public=0, updated_at=? WHERE id=? RETURNING {_DOC_COLUMNS}"
+# update_document copies the current row into document_revisions and applies
+# the edit (NULL keeps a field) without first reading the row into Python.
+_SQL_ARCHIVE_REVISION = (
+    "INSERT OR IGNORE INTO document_revisions "
+    "SELECT id, version, title, body, ?, ? FROM documents WHERE id=?"
+)
+_SQL_UPDATE_DOC = (
+    "UPDATE documents SET title=coalesce(?, title), body=coalesce(?, body), "
+    f"tags=coalesce(?, tags), updated_at=?, version=version+1 WHERE id=? RETURNING {_DOC_COLUMNS}"
+)
+_DOC_COLUMNS_D = ", ".join("d." + c for c in _DOC_COLUMNS.split(", "))
+# search() statements keyed by (public_only, has category filter), so each
+# combination always runs the same cached statement.
+_SEARCH_FILTERS = {
+    (public_only, has_category): ("AND d.is_public=1 " if public_only else "")
+    + ("AND d.category=? " if has_category else "")
+    for public_only in (False, True) for has_category in (False, True)
+}
+# One per search word the trigram index cannot match (under three characters);
+# the word is bound three times, with LIKE wildcards escaped.
+_SQL_LIKE_TERM = "(d.title LIKE ? ESCAPE '\\' OR d.body LIKE ? ESCAPE '\\' OR d.tags LIKE ? ESCAPE '\\')"
+
+
+# Bounded: the LIKE clause count comes from user input, so the number of
+# distinct query shapes is not.
+@functools.lru_cache(maxsize=64)
+def _search_sql(use_fts: bool, n_like: int, public_only: bool, has_category: bool) -> str:
+    """search() statement for one query shape; the same shape reuses the same text."""
+    where = " AND ".join(["documents_fts MATCH ?"] * use_fts + [_SQL_LIKE_TERM] * n_like) or "1"
+    filters = _SEARCH_FILTERS[(public_only, has_category)]
+    if use_fts:
+        return (f"SELECT {_DOC_COLUMNS_D} FROM documents_fts f JOIN documents d ON d.rowid = f.rowid "
+                f"WHERE {where} {filters}ORDER BY f.rank")
+    # No indexed word to rank by: documents come back in insertion order.
+    return f"SELECT {_DOC_COLUMNS_D} FROM documents d WHERE {where} {filters}ORDER BY d.rowid"
+
+
+# Deletes take the IDs as one JSON array parameter, so any number of documents
+# is removed by a fixed set of statements. There is no AFTER DELETE trigger on
+# documents: the FTS entries are removed here in one set-based statement
+# rather than one FTS rewrite per row. Delete documents via delete_documents().
+_SQL_DELETE_DOCS_FTS = (
+    "DELETE FROM documents_fts WHERE rowid IN "
+    "(SELECT rowid FROM documents WHERE id IN (SELECT value FROM json_each(?)))"
+)
+_SQL_DELETE_DOCS_REVISIONS = "DELETE FROM document_revisions WHERE id IN (SELECT value FROM json_each(?))"
+_SQL_DELETE_DOCS = "DELETE FROM documents WHERE id IN (SELECT value FROM json_each(?))"
+_SQL_INSERT_FOIA = "INSERT INTO foia_requests VALUES (?,?,?,?,?,?,?,?)"
+_SQL_FULFILL_FOIA = (
+    "UPDATE foia_requests SET status='fulfilled', response=?, document_ids=?, updated_at=? "
+    f"WHERE id=? RETURNING {_FOIA_COLUMNS}"
+)
+# foia_documents is the queryable link table; foia_requests.document_ids keeps
+# the same IDs as a JSON list for existing readers.
+_SQL_UNLINK_FOIA_DOCS = "DELETE FROM foia_documents WHERE request_id=?"
+_SQL_LINK_FOIA_DOC = "INSERT OR IGNORE INTO foia_documents(request_id, doc_id) VALUES (?,?)"
+_SQL_FOIA_FOR_DOC = (
+    "SELECT " + ", ".join("f." + c for c in _FOIA_COLUMNS.split(", ")) + " "
+    "FROM foia_documents fd JOIN foia_requests f ON f.id = fd.request_id "
+    "WHERE fd.doc_id=? ORDER BY f.created_at DESC"
+)
+_SQL_LIST_FOIA = f"SELECT {_FOIA_COLUMNS} FROM foia_requests ORDER BY created_at DESC"
+_SQL_LIST_FOIA_BY_STATUS = f"SELECT {_FOIA_COLUMNS} FROM foia_requests WHERE status=? ORDER BY created_at DESC"
+
+
 def get_db(path: Path = DB_PATH) -> sqlite3.Connection:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(path))
-    conn.row_factory = sqlite3.Row
+    conn = _CONN_CACHE.get(path)
+    if conn is not None:
+        return conn
+    with _CONN_LOCK:
+        conn = _CONN_CACHE.get(path)
+        if conn is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Implicit transactions open with BEGIN IMMEDIATE: each writer takes
+            # the write lock up front rather than upgrading mid-transaction,
+            # which under WAL can fail with SQLITE_BUSY without waiting.
+            conn = sqlite3.connect(
+                str(path), check_same_thread=False, cached_statements=256,
+                isolation_level="IMMEDIATE", factory=_WriterConnection,
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
+            init_db(conn)
+            _CONN_CACHE[path] = conn
     return conn
 
 
+def close_all() -> None:
+    """Close every cached connection (registered to run at interpreter exit)."""
+    with _CONN_LOCK:
+        for conn in _CONN_CACHE.values():
+            # Refreshes planner statistics for the filter indexes when SQLite
+            # judges them stale; usually a no-op. Best effort: a busy or broken
+            # connection must not stop this one or the rest from closing.
+            try:
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            finally:
+                conn.close()
+        _CONN_CACHE.clear()
+
+
+atexit.register(close_all)
+
+
 def init_db(conn: sqlite3.Connection) -> None:
+    """
+    Create or upgrade the schema. Cheap once applied: a database stamped with
+    the current _SCHEMA_VERSION is left alone, so a fresh process skips the
+    DDL script entirely.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+        return
+    rebuild_fts = not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='documents_au'"
+    ).fetchone()
+    fts = conn.execute("SELECT sql FROM sqlite_master WHERE name='documents_fts'").fetchone()
+    if fts and "trigram" not in fts[0]:
+        # Tokenizers are fixed at creation: replace the old word-based index.
+        conn.execute("DROP TABLE documents_fts")
+        rebuild_fts = True
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS documents (
             id          TEXT PRIMARY KEY,
@@ -105,14 +299,18 @@ def init_db(conn: sqlite3.Connection) -> None:
             version     INTEGER DEFAULT 1
         );
         CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts
-            USING fts5(id UNINDEXED, title, body, tags, content='documents', content_rowid='rowid');
+            USING fts5(id UNINDEXED, title, body, tags, content='documents', content_rowid='rowid',
+                       tokenize='trigram');
         CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
             INSERT INTO documents_fts(rowid, id, title, body, tags)
             VALUES (new.rowid, new.id, new.title, new.body, new.tags);
         END;
-        CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+        DROP TRIGGER IF EXISTS documents_ad;
+        CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE OF title, body, tags ON documents BEGIN
             INSERT INTO documents_fts(documents_fts, rowid, id, title, body, tags)
             VALUES ('delete', old.rowid, old.id, old.title, old.body, old.tags);
+            INSERT INTO documents_fts(rowid, id, title, body, tags)
+            VALUES (new.rowid, new.id, new.title, new.body, new.tags);
         END;
         CREATE TABLE IF NOT EXISTS document_revisions (
             id          TEXT NOT NULL,
@@ -133,8 +331,29 @@ def init_db(conn: sqlite3.Connection) -> None:
             response     TEXT DEFAULT '',
             document_ids TEXT DEFAULT '[]'
         );
+        CREATE INDEX IF NOT EXISTS idx_documents_category
+            ON documents(category, is_public, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_documents_public
+            ON documents(is_public, created_at DESC);
+        CREATE INDEX IF NOT EXISTS idx_foia_status
+            ON foia_requests(status, created_at DESC);
+        CREATE TABLE IF NOT EXISTS foia_documents (
+            request_id  TEXT NOT NULL,
+            doc_id      TEXT NOT NULL,
+            PRIMARY KEY(request_id, doc_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_foia_documents_doc
+            ON foia_documents(doc_id);
+        INSERT OR IGNORE INTO foia_documents(request_id, doc_id)
+            SELECT f.id, j.value FROM foia_requests f, json_each(f.document_ids) j
+            WHERE json_valid(f.document_ids);
     """)
-    conn.commit()
+    if rebuild_fts:
+        # Re-index from the documents table: the index was just recreated, or
+        # predates documents_au and may hold stale entries for edited documents.
+        with conn:
+            conn.execute("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')")
+    conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
 
 
 # ── Core Document API ─────────────────────────────────────────────────────────
@@ -149,10 +368,9 @@ def create_document(
     db_path: Path = DB_PATH,
 ) -> Document:
     """Create a new document record (draft by default)."""
-    if category not in VALID_CATEGORIES:
+    if category not in _VALID_CATEGORIES_SET:
         raise ValueError(f"Unknown category '{category}'. Valid: {VALID_CATEGORIES}")
     conn = get_db(db_path)
-    init_db(conn)
     now = datetime.now(timezone.utc).isoformat()
     doc = Document(
         id=str(uuid.uuid4())[:10],
@@ -166,44 +384,62 @@ def create_document(
         is_public=is_public,
         version=1,
     )
-    conn.execute("INSERT INTO documents VALUES (?,?,?,?,?,?,?,?,?,?)", doc.to_row())
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute(_SQL_INSERT_DOC, doc.to_row())
     return doc
 
 
+def create_documents(items: List[dict], db_path: Path = DB_PATH) -> List[Document]:
+    """
+    Create many documents in one transaction. Each item needs title, category,
+    body and author keys (tags and is_public are optional). Every item is
+    validated before anything is written.
+    """
+    unknown = sorted({i["category"] for i in items} - _VALID_CATEGORIES_SET)
+    if unknown:
+        raise ValueError(f"Unknown category(s) {unknown}. Valid: {VALID_CATEGORIES}")
+    now = datetime.now(timezone.utc).isoformat()
+    docs = [
+        Document(
+            id=str(uuid.uuid4())[:10],
+            title=i["title"],
+            category=i["category"],
+            body=i["body"],
+            tags=i.get("tags", ""),
+            author=i["author"],
+            created_at=now,
+            updated_at=now,
+            is_public=bool(i.get("is_public", False)),
+            version=1,
+        )
+        for i in items
+    ]
+    conn = get_db(db_path)
+    with conn:
+        conn.executemany(_SQL_INSERT_DOC, [d.to_row() for d in docs])
+    return docs
+
+
 def publish(doc_id: str, db_path: Path = DB_PATH) -> Document:
     """Mark a document as publicly accessible."""
     conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute("SELECT * FROM documents WHERE id=?", (doc_id,)).fetchone()
+    now = datetime.now(timezone.utc).isoformat()
+    with conn:
+        row = conn.execute(_SQL_PUBLISH, (now, doc_id)).fetchone()
     if not row:
         raise ValueError(f"Document '{doc_id}' not found.")
-    now = datetime.now(timezone.utc).isoformat()
-    conn.execute(
-        "UPDATE documents SET is_public=1, updated_at=? WHERE id=?", (now, doc_id)
-    )
-    conn.commit()
-    updated = Document.from_row(conn.execute("SELECT * FROM documents WHERE id=?", (doc_id,)).fetchone())
-    conn.close()
-    return updated
+    return Document.from_row(row)
 
 
 def retract(doc_id: str, db_path: Path = DB_PATH) -> Document:
     """Remove public access to a document."""
     conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute("SELECT * FROM documents WHERE id=?", (doc_id,)).fetchone()
+    now = datetime.now(timezone.utc).isoformat()
+    with conn:
+        row = conn.execute(_SQL_RETRACT, (now, doc_id)).fetchone()
     if not row:
         raise ValueError(f"Document '{doc_id}' not found.")
-    now = datetime.now(timezone.utc).isoformat()
-    conn.execute(
-        "UPDATE documents SET is_public=0, updated_at=? WHERE id=?", (now, doc_id)
-    )
-    conn.commit()
-    updated = Document.from_row(conn.execute("SELECT * FROM documents WHERE id=?", (doc_id,)).fetchone())
-    conn.close()
-    return updated
+    return Document.from_row(row)
 
 
 def update_document(
@@ -216,42 +452,36 @@ def update_document(
 ) -> Document:
     """Update document content and bump version, archiving the previous revision."""
     conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute("SELECT * FROM documents WHERE id=?", (doc_id,)).fetchone()
+    now = datetime.now(timezone.utc).isoformat()
+    with conn:
+        # Archive current version
+        conn.execute(_SQL_ARCHIVE_REVISION, (editor, now, doc_id))
+        row = conn.execute(_SQL_UPDATE_DOC, (title, body, tags, now, doc_id)).fetchone()
     if not row:
         raise ValueError(f"Document '{doc_id}' not found.")
-    old = Document.from_row(row)
-    # Archive current version
-    conn.execute(
-        "INSERT OR IGNORE INTO document_revisions VALUES (?,?,?,?,?,?)",
-        (old.id, old.version, old.title, old.body, editor,
-         datetime.now(timezone.utc).isoformat()),
-    )
-    now = datetime.now(timezone.utc).isoformat()
-    new_title = title if title is not None else old.title
-    new_body = body if body is not None else old.body
-    new_tags = tags if tags is not None else old.tags
-    new_version = old.version + 1
-    conn.execute(
-        "UPDATE documents SET title=?, body=?, tags=?, updated_at=?, version=? WHERE id=?",
-        (new_title, new_body, new_tags, now, new_version, doc_id),
-    )
-    conn.commit()
-    updated = Document.from_row(conn.execute("SELECT * FROM documents WHERE id=?", (doc_id,)).fetchone())
-    conn.close()
-    return updated
+    return Document.from_row(row)
+
+
+def delete_documents(doc_ids: List[str], db_path: Path = DB_PATH) -> int:
+    """
+    Permanently delete documents, their revision history and their search
+    index entries in one transaction. Unknown IDs are ignored. Returns the
+    number of documents deleted.
+    """
+    conn = get_db(db_path)
+    ids = json.dumps(list(doc_ids))
+    with conn:
+        conn.execute(_SQL_DELETE_DOCS_FTS, (ids,))
+        conn.execute(_SQL_DELETE_DOCS_REVISIONS, (ids,))
+        return conn.execute(_SQL_DELETE_DOCS, (ids,)).rowcount
 
 
 def get_document(doc_id: str, public_only: bool = False, db_path: Path = DB_PATH) -> Optional[Document]:
     conn = get_db(db_path)
-    init_db(conn)
     if public_only:
-        row = conn.execute(
-            "SELECT * FROM documents WHERE id=? AND is_public=1", (doc_id,)
-        ).fetchone()
+        row = conn.execute(_SQL_SELECT_PUBLIC_DOC, (doc_id,)).fetchone()
     else:
-        row = conn.execute("SELECT * FROM documents WHERE id=?", (doc_id,)).fetchone()
-    conn.close()
+        row = conn.execute(_SQL_SELECT_DOC, (doc_id,)).fetchone()
     return Document.from_row(row) if row else None
 
 
@@ -261,41 +491,29 @@ def search(
     public_only: bool = True,
     db_path: Path = DB_PATH,
 ) -> List[Document]:
-    """Full-text search across titles, body, and tags."""
+    """
+    Full-text search across titles, body, and tags. Matches documents that
+    contain every word of the query as a case-insensitive substring.
+    """
     conn = get_db(db_path)
-    init_db(conn)
-    fts_query = f'"{query}"' if " " in query else query
-    try:
-        fts_rows = conn.execute(
-            "SELECT id FROM documents_fts WHERE documents_fts MATCH ? ORDER BY rank",
-            (fts_query,),
-        ).fetchall()
-        matched_ids = [r["id"] for r in fts_rows]
-    except Exception:
-        # Fallback: LIKE search
-        matched_ids = [
-            r["id"] for r in conn.execute(
-                "SELECT id FROM documents WHERE title LIKE ? OR body LIKE ? OR tags LIKE ?",
-                (f"%{query}%", f"%{query}%", f"%{query}%"),
-            ).fetchall()
-        ]
-
-    results = []
-    for doc_id in matched_ids:
-        clauses = ["id=?"]
-        params: list = [doc_id]
-        if public_only:
-            clauses.append("is_public=1")
-        if category:
-            clauses.append("category=?")
-            params.append(category)
-        row = conn.execute(
-            f"SELECT * FROM documents WHERE {' AND '.join(clauses)}", params
-        ).fetchone()
-        if row:
-            results.append(Document.from_row(row))
-    conn.close()
-    return results
+    terms = query.split()
+    # Every word must occur as a substring. Words of three or more characters
+    # go to the trigram index, each quoted as an FTS5 string so operators and
+    # punctuation in user input are literal; the index cannot match shorter
+    # words, which are checked with LIKE instead.
+    indexed = [t for t in terms if len(t) >= 3]
+    short = [t for t in terms if len(t) < 3]
+    params = []
+    if indexed:
+        params.append(" ".join('"' + t.replace('"', '""') + '"' for t in indexed))
+    for t in short:
+        like = "%" + t.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        params += (like, like, like)
+    if category:
+        params.append(category)
+    sql = _search_sql(bool(indexed), len(short), bool(public_only), bool(category))
+    rows = conn.execute(sql, params).fetchall()
+    return [Document.from_row(r) for r in rows]
 
 
 def list_documents(
@@ -304,7 +522,6 @@ def list_documents(
     db_path: Path = DB_PATH,
 ) -> List[Document]:
     conn = get_db(db_path)
-    init_db(conn)
     clauses, params = [], []
     if category:
         clauses.append("category=?")
@@ -313,38 +530,37 @@ def list_documents(
         clauses.append("is_public=1")
     where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
     rows = conn.execute(
-        f"SELECT * FROM documents {where} ORDER BY created_at DESC", params
+        f"SELECT {_DOC_COLUMNS} FROM documents {where} ORDER BY created_at DESC", params
     ).fetchall()
-    conn.close()
-    return [Document.from_row(r) for r in rows]
+    return list(map(Document.from_row, rows))
 
 
 def export_bundle(
     category: str,
     output_path: str,
     public_only: bool = True,
+    compresslevel: int = 6,
     db_path: Path = DB_PATH,
 ) -> str:
-    """Export all documents in a category as a ZIP bundle (JSON + index.csv)."""
+    """
+    Export all documents in a category as a ZIP bundle (JSON + index.csv).
+    The archive is written straight to output_path; compresslevel is the
+    zlib level (1 is several times faster, at a modest size cost).
+    """
     docs = list_documents(category=category, public_only=public_only, db_path=db_path)
     if not docs:
         raise ValueError(f"No documents found for category '{category}'.")
-    out = io.BytesIO()
-    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
         index_rows = []
         for doc in docs:
-            filename = f"{doc.id}_{doc.title[:40].replace(' ', '_')}.json"
-            zf.writestr(filename, json.dumps(asdict(doc), indent=2))
-            index_rows.append({
-                "id": doc.id, "title": doc.title, "author": doc.author,
-                "created_at": doc.created_at, "version": doc.version, "file": filename,
-            })
-        idx_buf = io.StringIO()
-        w = csv.DictWriter(idx_buf, fieldnames=["id", "title", "author", "created_at", "version", "file"])
-        w.writeheader()
-        w.writerows(index_rows)
-        zf.writestr("index.csv", idx_buf.getvalue())
-    Path(output_path).write_bytes(out.getvalue())
+            filename = f"{doc.id}_{doc.title[:40].translate(_FILENAME_TRANS)}.json"
+            # Bundle members are machine-read, so skip the indented encoder.
+            zf.writestr(filename, doc.to_json(indent=None))
+            index_rows.append((doc.id, doc.title, doc.author, doc.created_at, doc.version, filename))
+        with io.TextIOWrapper(zf.open("index.csv", "w"), encoding="utf-8", newline="") as idx:
+            w = csv.writer(idx)
+            w.writerow(("id", "title", "author", "created_at", "version", "file"))
+            w.writerows(index_rows)
     return output_path
 
 
@@ -354,7 +570,6 @@ def submit_foia(
     requester: str, description: str, db_path: Path = DB_PATH
 ) -> FoiaRequest:
     conn = get_db(db_path)
-    init_db(conn)
     now = datetime.now(timezone.utc).isoformat()
     req = FoiaRequest(
         id=str(uuid.uuid4())[:8],
@@ -366,9 +581,8 @@ def submit_foia(
         response="",
         document_ids="[]",
     )
-    conn.execute("INSERT INTO foia_requests VALUES (?,?,?,?,?,?,?,?)", req.to_row())
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute(_SQL_INSERT_FOIA, req.to_row())
     return req
 
 
@@ -379,30 +593,32 @@ def fulfill_foia(
     db_path: Path = DB_PATH,
 ) -> FoiaRequest:
     conn = get_db(db_path)
-    init_db(conn)
     now = datetime.now(timezone.utc).isoformat()
-    conn.execute(
-        "UPDATE foia_requests SET status='fulfilled', response=?, document_ids=?, updated_at=? WHERE id=?",
-        (response, json.dumps(doc_ids or []), now, request_id),
-    )
-    conn.commit()
-    row = conn.execute("SELECT * FROM foia_requests WHERE id=?", (request_id,)).fetchone()
-    conn.close()
-    if not row:
-        raise ValueError(f"FOIA request '{request_id}' not found.")
+    doc_ids = list(dict.fromkeys(doc_ids or []))
+    with conn:
+        row = conn.execute(
+            _SQL_FULFILL_FOIA,
+            (response, json.dumps(doc_ids), now, request_id),
+        ).fetchone()
+        if not row:
+            raise ValueError(f"FOIA request '{request_id}' not found.")
+        conn.execute(_SQL_UNLINK_FOIA_DOCS, (request_id,))
+        conn.executemany(_SQL_LINK_FOIA_DOC, [(request_id, d) for d in doc_ids])
     return FoiaRequest.from_row(row)
 
 
+def foia_requests_for_document(doc_id: str, db_path: Path = DB_PATH) -> List[FoiaRequest]:
+    """Return the FOIA requests whose response included the given document."""
+    conn = get_db(db_path)
+    return [FoiaRequest.from_row(r) for r in conn.execute(_SQL_FOIA_FOR_DOC, (doc_id,))]
+
+
 def list_foia(status: Optional[str] = None, db_path: Path = DB_PATH) -> List[FoiaRequest]:
     conn = get_db(db_path)
-    init_db(conn)
     if status:
-        rows = conn.execute(
-            "SELECT * FROM foia_requests WHERE status=? ORDER BY created_at DESC", (status,)
-        ).fetchall()
+        rows = conn.execute(_SQL_LIST_FOIA_BY_STATUS, (status,)).fetchall()
     else:
-        rows = conn.execute("SELECT * FROM foia_requests ORDER BY created_at DESC").fetchall()
-    conn.close()
+        rows = conn.execute(_SQL_LIST_FOIA).fetchall()
     return [FoiaRequest.from_row(r) for r in rows]
 
 
@@ -412,9 +628,9 @@ def cmd_create(args):
     doc = create_document(
         args.title, args.category, args.body,
         args.author, args.tags or "",
-        is_public="--public" in sys.argv,
+        is_public=args.public,
     )
-    print(json.dumps(asdict(doc), indent=2))
+    print(doc.to_json())
 
 
 def cmd_publish(args):
@@ -432,7 +648,7 @@ def cmd_get(args):
     if not doc:
         print(f"Document '{args.doc_id}' not found.", file=sys.stderr)
         sys.exit(1)
-    print(json.dumps(asdict(doc), indent=2))
+    print(doc.to_json())
 
 
 def cmd_search(args):
@@ -456,19 +672,20 @@ def cmd_list(args):
 
 
 def cmd_export(args):
-    path = export_bundle(args.category, args.output, public_only=not bool(args.all))
+    path = export_bundle(args.category, args.output, public_only=not bool(args.all),
+                         compresslevel=1 if args.fast else 6)
     print(f"✅ Bundle exported to {path}")
 
 
 def cmd_foia_submit(args):
     req = submit_foia(args.requester, args.description)
-    print(json.dumps(asdict(req), indent=2))
+    print(req.to_json())
 
 
 def cmd_foia_fulfill(args):
     req = fulfill_foia(args.request_id, args.response,
                        doc_ids=args.docs.split(",") if args.docs else [])
-    print(json.dumps(asdict(req), indent=2))
+    print(req.to_json())
 
 
 def cmd_foia_list(args):
@@ -483,6 +700,7 @@ def cmd_foia_list(args):
         print(f"{icon} [{r.id}] {r.requester:<20} | {r.description[:50]} | {r.status}")
 
 
+@functools.lru_cache(maxsize=None)
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(
         prog="public_records",
@@ -532,6 +750,7 @@ def build_parser() -> argparse.ArgumentParser:
     ex.add_argument("category", choices=VALID_CATEGORIES)
     ex.add_argument("--output", required=True)
     ex.add_argument("--all", action="store_true", help="Include non-public docs")
+    ex.add_argument("--fast", action="store_true", help="Faster, lighter compression")
     ex.set_defaults(func=cmd_export)
 
     # foia submit
@@ -555,9 +774,37 @@ def build_parser() -> argparse.ArgumentParser:
     return p
 
 
-def main() -> None:
-    parser = build_parser()
-    args = parser.parse_args()
+# Subcommand -> (handler, positional names, option defaults). When argv is just
+# a known subcommand and its positionals, main() builds the namespace directly
+# and skips constructing the full parser; options, --help, typos and wrong
+# arity all fall through to argparse. Commands whose positionals have choices
+# are left out. Defaults must mirror build_parser().
+_FAST_COMMANDS = {
+    "publish": (cmd_publish, ("doc_id",), {}),
+    "retract": (cmd_retract, ("doc_id",), {}),
+    "get": (cmd_get, ("doc_id",), {}),
+    "search": (cmd_search, ("query",), {"category": None}),
+    "list": (cmd_list, (), {"category": None, "public": False}),
+    "foia-submit": (cmd_foia_submit, ("requester", "description"), {}),
+    "foia-fulfill": (cmd_foia_fulfill, ("request_id", "response"), {"docs": None}),
+    "foia-list": (cmd_foia_list, (), {"status": None}),
+}
+
+
+def _fast_args(argv: List[str]) -> Optional[argparse.Namespace]:
+    spec = _FAST_COMMANDS.get(argv[0]) if argv else None
+    if spec is None:
+        return None
+    func, names, defaults = spec
+    values = argv[1:]
+    if len(values) != len(names) or any(v.startswith("-") for v in values):
+        return None
+    return argparse.Namespace(command=argv[0], func=func, **defaults, **dict(zip(names, values)))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    args = _fast_args(argv) or build_parser().parse_args(argv)
     try:
         args.func(args)
     except (ValueError, RuntimeError) as exc:
@@ -5,20 +5,35 @@ Supports ballot creation, voter eligibility, double-vote prevention,
 cryptographic vote signing, tallying, and JSON/CSV export.
 """
 import argparse
+import atexit
 import csv
 import hashlib
+import hmac
 import io
 import json
+import os
+import queue
+import secrets
 import sqlite3
 import sys
-import uuid
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, asdict, field
 from datetime import datetime, timezone, timedelta
+from itertools import repeat
+from json.encoder import encode_basestring_ascii
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple
 
 DB_PATH = Path.home() / ".blackroad" / "voting.db"
 
+# Voting windows are also stored as integer microseconds since the epoch
+# (ballots.start_us/end_us), so cast_vote compares integers in SQL instead of
+# ISO strings, which only order correctly when they share a UTC offset.
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
 
 # ── Dataclasses ──────────────────────────────────────────────────────────────
 
@@ -65,14 +80,196 @@ class Vote:
 
 # ── Database ─────────────────────────────────────────────────────────────────
 
-def get_db(path: Path = DB_PATH) -> sqlite3.Connection:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(path))
-    conn.row_factory = sqlite3.Row
+# One long-lived connection per database file; the schema is created when the
+# connection is first opened and the connection is reused for every call.
+_CONN_CACHE: Dict[Path, sqlite3.Connection] = {}
+_CONN_LOCK = threading.Lock()
+
+
+class _WriterConnection(sqlite3.Connection):
+    """
+    The cached writer connection is shared by every thread, so its `with`
+    blocks take a lock: one thread's transaction cannot interleave with,
+    commit or roll back another's.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._tx_lock = threading.RLock()
+
+    def __enter__(self):
+        self._tx_lock.acquire()
+        return super().__enter__()
+
+    def __exit__(self, *exc_info):
+        try:
+            return super().__exit__(*exc_info)
+        finally:
+            self._tx_lock.release()
+
+
+# Query-only functions borrow read-only connections from a per-file pool (see
+# read_conn), so concurrent tally/verify/list calls run side by side under WAL
+# instead of queueing on the writer connection. Up to _READ_POOL_SIZE idle
+# connections are kept; extra concurrent readers open one and close it after.
+_READ_POOLS: Dict[Path, "queue.LifoQueue[sqlite3.Connection]"] = {}
+_READ_POOL_SIZE = 4
+
+# Applied once per connection. WAL keeps tally/verify readers from blocking
+# cast_vote and, with synchronous=NORMAL, avoids an fsync on every commit; a
+# power loss can then drop the last few commits, though never corrupt the
+# database. Note that WAL mode creates "-wal" and "-shm" sidecar files.
+_READ_PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+_PRAGMAS = ("PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL") + _READ_PRAGMAS
+
+
+# Stored in PRAGMA user_version once init_db has brought a database up to
+# date. Bump it whenever init_db gains a schema change.
+_SCHEMA_VERSION = 1
+
+# Hot statements are module-level constants so every call hands sqlite3 the
+# same text and hits its per-connection statement cache.
+_BALLOT_COLUMNS = "id, title, description, options, start_time, end_time, is_active, created_at"
+_VOTE_COLUMNS = "id, voter_id, ballot_id, choice, timestamp, signature"
+_SQL_SELECT_BALLOT = f"SELECT {_BALLOT_COLUMNS} FROM ballots WHERE id=?"
+_SQL_INSERT_BALLOT = f"INSERT INTO ballots ({_BALLOT_COLUMNS}, start_us, end_us) VALUES (?,?,?,?,?,?,?,?,?,?)"
+_SQL_CLOSE_BALLOT = "UPDATE ballots SET is_active=0 WHERE id=?"
+_SQL_BALLOT_TITLE = "SELECT title FROM ballots WHERE id=?"
+_SQL_REGISTER_VOTER = "INSERT OR IGNORE INTO eligible_voters VALUES (?,?,?)"
+_SQL_IS_ELIGIBLE = "SELECT 1 FROM eligible_voters WHERE voter_id=? AND ballot_id=?"
+# One row per option in ballot order; each count is answered from the
+# (ballot_id, choice) index without touching the votes table itself.
+_SQL_TALLY = """
+    SELECT o.value, (SELECT COUNT(*) FROM votes v
+                     WHERE v.ballot_id=o.ballot_id AND v.choice=o.value)
+    FROM ballot_options o WHERE o.ballot_id=? ORDER BY o.position
+"""
+_SQL_SELECT_VOTES = f"SELECT {_VOTE_COLUMNS} FROM votes WHERE ballot_id=?"
+_SQL_SIGNED_VOTES = "SELECT id, voter_id, choice, timestamp, signature FROM votes WHERE ballot_id=?"
+_VOTE_FIELDS = tuple(_VOTE_COLUMNS.split(", "))
+# One exported vote as json.dumps(..., indent=2) lays it out inside the votes
+# array. Every vote column is TEXT, so filling in C-escaped strings gives the
+# same text without going through the pure-Python indenting encoder.
+_VOTE_JSON_TEMPLATE = "{\n      " + ",\n      ".join(f'"{f}": %s' for f in _VOTE_FIELDS) + "\n    }"
+_EXPORT_CSV_HEADER = ("voter_id", "ballot_id", "choice", "timestamp", "signature")
+_SQL_EXPORT_VOTES = f"SELECT {', '.join(_EXPORT_CSV_HEADER)} FROM votes WHERE ballot_id=?"
+
+# Options live one per row in ballot_options; ballots.options keeps the JSON
+# list as a denormalized copy, written alongside and never changed, that only
+# list_ballots reads (embedded in its JSON aggregate below).
+_SQL_INSERT_OPTION = "INSERT INTO ballot_options (ballot_id, position, value) VALUES (?,?,?)"
+_SQL_BALLOT_OPTIONS = "SELECT value FROM ballot_options WHERE ballot_id=? ORDER BY position"
+
+# list_ballots has SQLite build the whole result as one JSON array, newest
+# first, so Python parses a single document instead of converting every row.
+_SQL_LIST_BALLOTS = """
+    SELECT json_group_array(json_object(
+        'id', id, 'title', title, 'description', description, 'options', json(options),
+        'start_time', start_time, 'end_time', end_time,
+        'is_active', json(iif(is_active, 'true', 'false')), 'created_at', created_at))
+    FROM (SELECT * FROM ballots ORDER BY created_at DESC)
+"""
+
+# cast_vote checks the ballot, window, choice and eligibility in one query;
+# a repeat vote is caught by the UNIQUE(voter_id, ballot_id) constraint on insert.
+_SQL_VOTE_CHECK = """
+    SELECT is_active,
+           :now < start_us AS not_open, :now > end_us AS ended,
+           EXISTS(SELECT 1 FROM ballot_options
+                  WHERE ballot_id=:ballot AND value=:choice) AS valid_choice,
+           EXISTS(SELECT 1 FROM eligible_voters
+                  WHERE voter_id=:voter AND ballot_id=:ballot) AS eligible
+    FROM ballots WHERE id=:ballot
+"""
+_SQL_INSERT_VOTE = f"INSERT INTO votes ({_VOTE_COLUMNS}) VALUES (?,?,?,?,?,?)"
+
+
+def get_db(path: Path = DB_PATH, durable: bool = False) -> sqlite3.Connection:
+    """
+    Return the cached connection for path, opening it on first use. Pass
+    durable=True on that first call to fsync every commit (synchronous=FULL).
+    """
+    conn = _CONN_CACHE.get(path)
+    if conn is not None:
+        return conn
+    with _CONN_LOCK:
+        conn = _CONN_CACHE.get(path)
+        if conn is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Implicit transactions open with BEGIN IMMEDIATE: each writer takes
+            # the write lock up front rather than upgrading mid-transaction,
+            # which under WAL can fail with SQLITE_BUSY without waiting.
+            conn = sqlite3.connect(
+                str(path), check_same_thread=False, cached_statements=256,
+                isolation_level="IMMEDIATE", factory=_WriterConnection,
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in _PRAGMAS:
+                conn.execute(pragma)
+            if durable:
+                conn.execute("PRAGMA synchronous=FULL")
+            init_db(conn)
+            _CONN_CACHE[path] = conn
     return conn
 
 
+@contextmanager
+def read_conn(path: Path = DB_PATH) -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a read-only connection to path for the duration of the block.
+    Reads through it never take the write lock or run DDL.
+    """
+    pool = _READ_POOLS.get(path)
+    if pool is None:
+        get_db(path)  # create or upgrade the schema once per process
+        with _CONN_LOCK:
+            pool = _READ_POOLS.setdefault(path, queue.LifoQueue(maxsize=_READ_POOL_SIZE))
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = sqlite3.connect(
+            path.resolve().as_uri() + "?mode=ro", uri=True,
+            check_same_thread=False, cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in _READ_PRAGMAS:
+            conn.execute(pragma)
+    try:
+        yield conn
+    finally:
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def close_all() -> None:
+    """Close every cached connection (registered to run at interpreter exit)."""
+    with _CONN_LOCK:
+        for pool in _READ_POOLS.values():
+            while not pool.empty():
+                pool.get_nowait().close()
+        _READ_POOLS.clear()
+        for conn in _CONN_CACHE.values():
+            conn.close()
+        _CONN_CACHE.clear()
+
+
+atexit.register(close_all)
+
+
 def init_db(conn: sqlite3.Connection) -> None:
+    """
+    Create or upgrade the schema. Cheap once applied: a database stamped with
+    the current _SCHEMA_VERSION is left alone, so a fresh process skips the
+    DDL script entirely.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+        return
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS ballots (
             id          TEXT PRIMARY KEY,
@@ -99,21 +296,92 @@ def init_db(conn: sqlite3.Connection) -> None:
             registered_at TEXT NOT NULL,
             PRIMARY KEY(voter_id, ballot_id)
         );
+        CREATE INDEX IF NOT EXISTS idx_votes_ballot_choice
+            ON votes(ballot_id, choice);
     """)
-    conn.commit()
+    _add_window_columns(conn)
+    _add_options_table(conn)
+    conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+
+def _add_window_columns(conn: sqlite3.Connection) -> None:
+    """Add and backfill ballots.start_us/end_us on databases that predate them."""
+    present = {r[1] for r in conn.execute("PRAGMA table_info(ballots)")}
+    if "start_us" in present:
+        return
+    with conn:
+        conn.execute("ALTER TABLE ballots ADD COLUMN start_us INTEGER")
+        conn.execute("ALTER TABLE ballots ADD COLUMN end_us INTEGER")
+        rows = conn.execute("SELECT id, start_time, end_time FROM ballots").fetchall()
+        for ballot_id, start_time, end_time in rows:
+            try:
+                window = (_epoch_us(start_time), _epoch_us(end_time))
+            except ValueError:
+                continue  # unparseable legacy value: the window stays open-ended
+            conn.execute("UPDATE ballots SET start_us=?, end_us=? WHERE id=?", (*window, ballot_id))
+
+
+def _add_options_table(conn: sqlite3.Connection) -> None:
+    """Create ballot_options, filling it from ballots.options on older databases."""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name='ballot_options'").fetchone():
+        return
+    with conn:
+        conn.execute("""
+            CREATE TABLE ballot_options (
+                ballot_id  TEXT NOT NULL,
+                position   INTEGER NOT NULL,
+                value      TEXT NOT NULL,
+                PRIMARY KEY(ballot_id, position)
+            )
+        """)
+        conn.execute("""
+            INSERT INTO ballot_options (ballot_id, position, value)
+            SELECT b.id, j.key, j.value FROM ballots b, json_each(b.options) j
+        """)
+
+
+def _ballot_options(conn: sqlite3.Connection, ballot_id: str) -> List[str]:
+    return [value for (value,) in conn.execute(_SQL_BALLOT_OPTIONS, (ballot_id,))]
+
+
+def _epoch_us(timestamp: str) -> int:
+    """ISO-8601 timestamp -> integer microseconds since the epoch (naive = UTC)."""
+    if timestamp.endswith(("Z", "z")):
+        # fromisoformat only accepts the "Z" suffix from Python 3.11.
+        timestamp = timestamp[:-1] + "+00:00"
+    dt = datetime.fromisoformat(timestamp)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // _MICROSECOND
 
 
 # ── Crypto helpers ────────────────────────────────────────────────────────────
 
+# With VOTING_SIGN_KEY set, votes are signed with HMAC-SHA256 under that key;
+# the keyed state is built once and copied per vote. Without it, signatures
+# stay plain SHA-256 so databases signed before the key existed still verify.
+_SIGN_KEY = os.environ.get("VOTING_SIGN_KEY", "").encode()
+_SIGN_HMAC = hmac.new(_SIGN_KEY, digestmod="sha256") if _SIGN_KEY else None
+
+
+def _signed_message(voter_id: str, ballot_id: str, choice: str, timestamp: str) -> bytes:
+    """The bytes a vote signature covers; _sign and verify_ballot both build them here."""
+    return f"{voter_id}:{ballot_id}:{choice}:{timestamp}".encode()
+
+
 def _sign(voter_id: str, ballot_id: str, choice: str, timestamp: str) -> str:
-    """Deterministic HMAC-style signature for vote integrity."""
-    raw = f"{voter_id}:{ballot_id}:{choice}:{timestamp}"
-    return hashlib.sha256(raw.encode()).hexdigest()
+    """Deterministic signature for vote integrity (keyed when VOTING_SIGN_KEY is set)."""
+    raw = _signed_message(voter_id, ballot_id, choice, timestamp)
+    if _SIGN_HMAC is None:
+        return hashlib.sha256(raw).hexdigest()
+    h = _SIGN_HMAC.copy()
+    h.update(raw)
+    return h.hexdigest()
 
 
 def verify_vote(vote: Vote) -> bool:
     expected = _sign(vote.voter_id, vote.ballot_id, vote.choice, vote.timestamp)
-    return vote.signature == expected
+    return hmac.compare_digest(vote.signature, expected)
 
 
 # ── Core API ──────────────────────────────────────────────────────────────────
@@ -129,10 +397,15 @@ def create_ballot(
     """Create and persist a new ballot."""
     if len(options) < 2:
         raise ValueError("A ballot must have at least 2 options.")
+    try:
+        window = (_epoch_us(start_time), _epoch_us(end_time))
+    except ValueError:
+        raise ValueError(
+            f"Invalid voting window '{start_time}' - '{end_time}': expected ISO-8601 timestamps."
+        ) from None
     conn = get_db(db_path)
-    init_db(conn)
     ballot = Ballot(
-        id=str(uuid.uuid4())[:8],
+        id=secrets.token_hex(4),
         title=title,
         description=description,
         options=options,
@@ -141,36 +414,35 @@ def create_ballot(
         is_active=True,
         created_at=datetime.now(timezone.utc).isoformat(),
     )
-    conn.execute(
-        "INSERT INTO ballots VALUES (?,?,?,?,?,?,?,?)", ballot.to_row()
-    )
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute(_SQL_INSERT_BALLOT, ballot.to_row() + window)
+        conn.executemany(_SQL_INSERT_OPTION, ((ballot.id, i, o) for i, o in enumerate(options)))
     return ballot
 
 
 def register_voter(voter_id: str, ballot_id: str, db_path: Path = DB_PATH) -> None:
     """Register a voter as eligible for a specific ballot."""
+    register_voters([(voter_id, ballot_id)], db_path)
+
+
+def register_voters(pairs: Iterable[Tuple[str, str]], db_path: Path = DB_PATH) -> None:
+    """
+    Register many (voter_id, ballot_id) pairs in one transaction. Pairs
+    that are already registered are left unchanged.
+    """
     conn = get_db(db_path)
-    init_db(conn)
     now = datetime.now(timezone.utc).isoformat()
-    conn.execute(
-        "INSERT OR IGNORE INTO eligible_voters VALUES (?,?,?)",
-        (voter_id, ballot_id, now),
-    )
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.executemany(
+            _SQL_REGISTER_VOTER,
+            ((voter_id, ballot_id, now) for voter_id, ballot_id in pairs),
+        )
 
 
 def validate_eligibility(voter_id: str, ballot_id: str, db_path: Path = DB_PATH) -> bool:
     """Return True if voter is registered for the ballot."""
-    conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute(
-        "SELECT 1 FROM eligible_voters WHERE voter_id=? AND ballot_id=?",
-        (voter_id, ballot_id),
-    ).fetchone()
-    conn.close()
+    with read_conn(db_path) as conn:
+        row = conn.execute(_SQL_IS_ELIGIBLE, (voter_id, ballot_id)).fetchone()
     return row is not None
 
 
@@ -181,68 +453,71 @@ def cast_vote(
     db_path: Path = DB_PATH,
 ) -> Vote:
     """Cast a vote. Prevents double-voting and validates eligibility + window."""
-    conn = get_db(db_path)
-    init_db(conn)
+    return cast_votes([(ballot_id, voter_id, choice)], db_path)[0]
 
-    row = conn.execute("SELECT * FROM ballots WHERE id=?", (ballot_id,)).fetchone()
+
+def cast_votes(votes: Iterable[Tuple[str, str, str]], db_path: Path = DB_PATH) -> List[Vote]:
+    """
+    Cast many (ballot_id, voter_id, choice) votes in one transaction. Each
+    vote is checked as cast_vote checks it; if any is rejected, none are recorded.
+    """
+    conn = get_db(db_path)
+    now = datetime.now(timezone.utc)
+    vote = None
+    try:
+        with conn:
+            # Take the write lock before checking, so no other thread or process
+            # can close the ballot or change eligibility between check and insert.
+            conn.execute("BEGIN IMMEDIATE")
+            cast = [_new_vote(conn, ballot_id, voter_id, choice, now) for ballot_id, voter_id, choice in votes]
+            for vote in cast:
+                conn.execute(_SQL_INSERT_VOTE, vote.to_row())
+    except sqlite3.IntegrityError as exc:
+        if "votes.voter_id" not in str(exc):
+            raise
+        raise ValueError(f"Voter '{vote.voter_id}' has already voted on ballot '{vote.ballot_id}'.") from None
+    return cast
+
+
+def _new_vote(conn: sqlite3.Connection, ballot_id: str, voter_id: str, choice: str, now: datetime) -> Vote:
+    """Validate one vote against the ballot and eligibility, then build and sign it."""
+    params = {"ballot": ballot_id, "voter": voter_id, "choice": choice, "now": (now - _EPOCH) // _MICROSECOND}
+    row = conn.execute(_SQL_VOTE_CHECK, params).fetchone()
     if not row:
         raise ValueError(f"Ballot '{ballot_id}' not found.")
 
-    ballot = Ballot.from_row(row)
-
-    if not ballot.is_active:
+    if not row["is_active"]:
         raise ValueError(f"Ballot '{ballot_id}' is closed.")
 
-    now_str = datetime.now(timezone.utc).isoformat()
-    if now_str < ballot.start_time:
+    if row["not_open"]:
         raise ValueError("Voting window has not opened yet.")
-    if now_str > ballot.end_time:
+    if row["ended"]:
         raise ValueError("Voting window has closed.")
 
-    if choice not in ballot.options:
-        raise ValueError(f"Invalid choice '{choice}'. Valid: {ballot.options}")
+    if not row["valid_choice"]:
+        raise ValueError(f"Invalid choice '{choice}'. Valid: {_ballot_options(conn, ballot_id)}")
 
-    if not validate_eligibility(voter_id, ballot_id, db_path):
+    if not row["eligible"]:
         raise ValueError(f"Voter '{voter_id}' is not registered for ballot '{ballot_id}'.")
 
-    dupe = conn.execute(
-        "SELECT 1 FROM votes WHERE voter_id=? AND ballot_id=?",
-        (voter_id, ballot_id),
-    ).fetchone()
-    if dupe:
-        raise ValueError(f"Voter '{voter_id}' has already voted on ballot '{ballot_id}'.")
-
-    timestamp = now_str
-    sig = _sign(voter_id, ballot_id, choice, timestamp)
-    vote = Vote(
-        id=str(uuid.uuid4())[:8],
+    timestamp = now.isoformat()
+    return Vote(
+        id=secrets.token_hex(4),
         voter_id=voter_id,
         ballot_id=ballot_id,
         choice=choice,
         timestamp=timestamp,
-        signature=sig,
+        signature=_sign(voter_id, ballot_id, choice, timestamp),
     )
-    conn.execute("INSERT INTO votes VALUES (?,?,?,?,?,?)", vote.to_row())
-    conn.commit()
-    conn.close()
-    return vote
 
 
 def tally(ballot_id: str, db_path: Path = DB_PATH) -> dict:
     """Return vote counts, percentages, and winner for a ballot."""
-    conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute("SELECT * FROM ballots WHERE id=?", (ballot_id,)).fetchone()
-    if not row:
-        raise ValueError(f"Ballot '{ballot_id}' not found.")
-    ballot = Ballot.from_row(row)
-
-    counts: dict = {opt: 0 for opt in ballot.options}
-    for vrow in conn.execute("SELECT choice FROM votes WHERE ballot_id=?", (ballot_id,)):
-        c = vrow["choice"]
-        if c in counts:
-            counts[c] += 1
-    conn.close()
+    with read_conn(db_path) as conn:
+        row = conn.execute(_SQL_BALLOT_TITLE, (ballot_id,)).fetchone()
+        if not row:
+            raise ValueError(f"Ballot '{ballot_id}' not found.")
+        counts: dict = dict(conn.execute(_SQL_TALLY, (ballot_id,)).fetchall())
 
     total = sum(counts.values())
     percentages = {
@@ -253,7 +528,7 @@ def tally(ballot_id: str, db_path: Path = DB_PATH) -> dict:
 
     return {
         "ballot_id": ballot_id,
-        "title": ballot.title,
+        "title": row["title"],
         "total_votes": total,
         "counts": counts,
         "percentages": percentages,
@@ -261,75 +536,146 @@ def tally(ballot_id: str, db_path: Path = DB_PATH) -> dict:
     }
 
 
+def export_results_iter(
+    ballot_id: str, fmt: str = "json", db_path: Path = DB_PATH, chunk_rows: int = 1000
+) -> Iterator[str]:
+    """
+    Stream full ballot results as JSON or CSV text, `chunk_rows` votes per
+    chunk. Votes go straight from the cursor to the output, never held as a list.
+    """
+    if fmt not in ("json", "csv"):
+        raise ValueError(f"Unknown format '{fmt}'. Use 'json' or 'csv'.")
+    summary = tally(ballot_id, db_path)
+    with read_conn(db_path) as conn:
+        if fmt == "csv":
+            yield from _csv_chunks(conn.execute(_SQL_EXPORT_VOTES, (ballot_id,)), chunk_rows)
+        else:
+            yield from _json_chunks(summary, conn.execute(_SQL_SELECT_VOTES, (ballot_id,)), chunk_rows)
+
+
+def _csv_chunks(cur: sqlite3.Cursor, chunk_rows: int) -> Iterator[str]:
+    out = io.StringIO()
+    w = csv.writer(out)
+    w.writerow(_EXPORT_CSV_HEADER)
+    while True:
+        rows = cur.fetchmany(chunk_rows)
+        if not rows:
+            break
+        w.writerows(rows)
+        yield out.getvalue()
+        out.seek(0)
+        out.truncate()
+    if out.tell():
+        yield out.getvalue()  # header only: no votes cast
+
+
+def _json_chunks(summary: dict, cur: sqlite3.Cursor, chunk_rows: int) -> Iterator[str]:
+    # Hand-assembled so the votes array streams; the text is identical to
+    # json.dumps({"summary": ..., "votes": [...]}, indent=2).
+    yield '{\n  "summary": ' + json.dumps(summary, indent=2).replace("\n", "\n  ") + ',\n  "votes": ['
+    rows = cur.fetchmany(chunk_rows)
+    if not rows:
+        yield "]\n}"
+        return
+    lead = "\n    "
+    while rows:
+        yield lead + ",\n    ".join([_VOTE_JSON_TEMPLATE % tuple(map(encode_basestring_ascii, r)) for r in rows])
+        lead = ",\n    "
+        rows = cur.fetchmany(chunk_rows)
+    yield "\n  ]\n}"
+
+
 def export_results(
     ballot_id: str, fmt: str = "json", db_path: Path = DB_PATH
 ) -> str:
     """Export full ballot results as JSON or CSV."""
-    summary = tally(ballot_id, db_path)
-    conn = get_db(db_path)
-    votes = [dict(v) for v in conn.execute(
-        "SELECT * FROM votes WHERE ballot_id=?", (ballot_id,)
-    ).fetchall()]
-    conn.close()
-
-    if fmt == "json":
-        return json.dumps({"summary": summary, "votes": votes}, indent=2)
-    elif fmt == "csv":
-        out = io.StringIO()
-        w = csv.writer(out)
-        w.writerow(["voter_id", "ballot_id", "choice", "timestamp", "signature"])
-        for v in votes:
-            w.writerow([v["voter_id"], v["ballot_id"], v["choice"], v["timestamp"], v["signature"]])
-        return out.getvalue()
-    raise ValueError(f"Unknown format '{fmt}'. Use 'json' or 'csv'.")
+    return "".join(export_results_iter(ballot_id, fmt, db_path))
+
+
+# verify_ballot hands ballots of at least _VERIFY_PARALLEL_MIN_ROWS votes to a
+# process pool in _VERIFY_CHUNK_ROWS slices; below that, spawning workers costs
+# more than hashing every vote in this process.
+_VERIFY_CHUNK_ROWS = 10_000
+_VERIFY_PARALLEL_MIN_ROWS = 5_000
+
+
+def _verify_chunk(ballot_id: str, rows: List[tuple]) -> List[dict]:
+    """Return {"id", "voter_id"} for each (id, voter_id, choice, timestamp, signature) row that fails."""
+    # Same digest as _sign, computed in one loop without a call per vote.
+    msgs = [_signed_message(voter_id, ballot_id, choice, timestamp) for _, voter_id, choice, timestamp, _ in rows]
+    if _SIGN_HMAC is None:
+        sha256 = hashlib.sha256
+        expected = [sha256(m).hexdigest() for m in msgs]
+    else:
+        expected = []
+        for m in msgs:
+            h = _SIGN_HMAC.copy()
+            h.update(m)
+            expected.append(h.hexdigest())
+    compare = hmac.compare_digest
+    return [
+        {"id": row[0], "voter_id": row[1]}
+        for row, digest in zip(rows, expected)
+        if not compare(digest, row[4])
+    ]
+
+
+def verify_ballot(ballot_id: str, db_path: Path = DB_PATH, workers: Optional[int] = None) -> dict:
+    """
+    Recompute every vote signature on a ballot. Returns the vote count and
+    the id/voter_id of each vote whose stored signature does not match.
+    Large ballots are checked across `workers` processes (default: one per CPU).
+    """
+    chunks = []
+    total = 0
+    with read_conn(db_path) as conn:
+        cur = conn.execute(_SQL_SIGNED_VOTES, (ballot_id,))
+        while True:
+            rows = cur.fetchmany(_VERIFY_CHUNK_ROWS)
+            if not rows:
+                break
+            chunks.append(rows)
+            total += len(rows)
+    if total < _VERIFY_PARALLEL_MIN_ROWS:
+        invalid = [bad for rows in chunks for bad in _verify_chunk(ballot_id, rows)]
+    else:
+        # sqlite3.Row does not pickle; workers get plain tuples.
+        chunks = [[tuple(r) for r in rows] for rows in chunks]
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            invalid = [bad for part in ex.map(_verify_chunk, repeat(ballot_id), chunks) for bad in part]
+    return {"ballot_id": ballot_id, "total_votes": total, "invalid": invalid}
 
 
 def close_ballot(ballot_id: str, db_path: Path = DB_PATH) -> None:
     """Deactivate a ballot so no further votes are accepted."""
     conn = get_db(db_path)
-    init_db(conn)
-    conn.execute("UPDATE ballots SET is_active=0 WHERE id=?", (ballot_id,))
-    conn.commit()
-    conn.close()
+    with conn:
+        conn.execute(_SQL_CLOSE_BALLOT, (ballot_id,))
 
 
 def list_ballots(db_path: Path = DB_PATH) -> List[dict]:
-    conn = get_db(db_path)
-    init_db(conn)
-    rows = conn.execute("SELECT * FROM ballots ORDER BY created_at DESC").fetchall()
-    conn.close()
-    result = []
-    for r in rows:
-        d = dict(r)
-        d["options"] = json.loads(d["options"])
-        d["is_active"] = bool(d["is_active"])
-        result.append(d)
-    return result
+    with read_conn(db_path) as conn:
+        return json.loads(conn.execute(_SQL_LIST_BALLOTS).fetchone()[0])
 
 
 def get_ballot(ballot_id: str, db_path: Path = DB_PATH) -> Optional[dict]:
-    conn = get_db(db_path)
-    init_db(conn)
-    row = conn.execute("SELECT * FROM ballots WHERE id=?", (ballot_id,)).fetchone()
-    conn.close()
-    if not row:
-        return None
-    d = dict(row)
-    d["options"] = json.loads(d["options"])
+    with read_conn(db_path) as conn:
+        row = conn.execute(_SQL_SELECT_BALLOT, (ballot_id,)).fetchone()
+        if not row:
+            return None
+        d = dict(row)
+        d["options"] = _ballot_options(conn, ballot_id)
     d["is_active"] = bool(d["is_active"])
     return d
 
 
 # ── CLI ───────────────────────────────────────────────────────────────────────
 
-def _now_plus(hours: int = 0) -> str:
-    return (datetime.now(timezone.utc) + timedelta(hours=hours)).isoformat()
-
-
 def cmd_create(args) -> None:
     options = [o.strip() for o in args.options.split(",")]
-    start = args.start or _now_plus(0)
-    end = args.end or _now_plus(int(args.duration_hours or 24))
+    now = datetime.now(timezone.utc)
+    start = args.start or now.isoformat()
+    end = args.end or (now + timedelta(hours=int(args.duration_hours or 24))).isoformat()
     b = create_ballot(args.title, args.description or "", options, start, end)
     print(json.dumps(asdict(b), indent=2))
 
@@ -350,12 +696,18 @@ def cmd_tally(args) -> None:
 
 
 def cmd_export(args) -> None:
-    output = export_results(args.ballot_id, fmt=args.format)
+    chunks = export_results_iter(args.ballot_id, fmt=args.format)
+    # The first chunk runs the format and ballot checks, so a bad request
+    # raises before an existing output file is opened and truncated.
+    first = next(chunks)
     if args.output:
-        Path(args.output).write_text(output)
+        with open(args.output, "w") as fh:
+            fh.write(first)
+            fh.writelines(chunks)
         print(f"✅ Exported to {args.output}")
     else:
-        print(output)
+        sys.stdout.write(first)
+        sys.stdout.writelines(chunks)
 
 
 def cmd_close(args) -> None:
@@ -375,18 +727,14 @@ def cmd_list(args) -> None:
 
 
 def cmd_verify(args) -> None:
-    conn = get_db()
-    init_db(conn)
-    votes = [Vote.from_row(r) for r in
-             conn.execute("SELECT * FROM votes WHERE ballot_id=?", (args.ballot_id,))]
-    conn.close()
-    invalid = [v for v in votes if not verify_vote(v)]
+    result = verify_ballot(args.ballot_id)
+    invalid = result["invalid"]
     if invalid:
         print(f"❌ {len(invalid)} invalid vote(s) detected!")
         for v in invalid:
-            print(f"   Vote {v.id} by {v.voter_id}")
+            print(f"   Vote {v['id']} by {v['voter_id']}")
         sys.exit(1)
-    print(f"✅ All {len(votes)} votes verified.")
+    print(f"✅ All {result['total_votes']} votes verified.")
 
 
 def build_parser() -> argparse.ArgumentParser:
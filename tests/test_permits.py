@@ -6,9 +6,10 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from permit_tracker import (
-    apply, approve, deny, expire_permit, expire_overdue,
-    get_permits_by_address, check_compliance, send_reminder,
-    export_csv, get_permit, list_permits,
+    apply, bulk_apply, approve, deny, expire_permit, expire_overdue,
+    get_permits_by_address, check_compliance, bulk_compliance,
+    send_reminder, send_reminders_bulk,
+    export_csv, export_csv_iter, get_permit, list_permits,
 )
 
 
@@ -25,11 +26,78 @@ def test_apply_permit(tmp_db):
     assert p.applicant == "Alice Smith"
 
 
+def test_permit_to_dict_matches_asdict(tmp_db):
+    import json
+    from dataclasses import asdict
+    p = apply("building", "Alice Smith", "123 Main St", db_path=tmp_db)
+    assert p.to_dict() == asdict(p)
+    assert json.loads(p.to_json()) == asdict(p)
+
+
+def test_apply_rolls_back_when_event_log_fails(tmp_db, monkeypatch):
+    import permit_tracker
+
+    def boom(*args):
+        raise RuntimeError("event log unavailable")
+
+    apply("building", "Alice Smith", "123 Main St", db_path=tmp_db)
+    monkeypatch.setattr(permit_tracker, "_log_event", boom)
+    with pytest.raises(RuntimeError):
+        apply("building", "Bob", "456 Oak Ave", db_path=tmp_db)
+    assert [p.applicant for p in list_permits(db_path=tmp_db)] == ["Alice Smith"]
+
+
+def test_writer_transactions_are_serialized_across_threads(tmp_db):
+    import threading
+    import permit_tracker
+    apply("building", "Alice Smith", "123 Main St", db_path=tmp_db)
+    done = threading.Event()
+
+    def write():
+        apply("electrical", "Bob", "456 Oak Ave", db_path=tmp_db)
+        done.set()
+
+    with permit_tracker.get_db(tmp_db):
+        t = threading.Thread(target=write)
+        t.start()
+        assert not done.wait(0.2)  # held back until this transaction ends
+    t.join(5)
+    assert done.is_set()
+    assert len(list_permits(db_path=tmp_db)) == 2
+
+
+def test_permit_columns_follow_field_order():
+    import permit_tracker
+    from dataclasses import fields
+    columns = permit_tracker._PERMIT_COLUMNS.split(", ")
+    assert columns == [f.name for f in fields(permit_tracker.Permit)]
+
+
 def test_invalid_permit_type(tmp_db):
     with pytest.raises(ValueError, match="Unknown permit type"):
         apply("unicorn_license", "Bob", "456 Oak Ave", db_path=tmp_db)
 
 
+def test_bulk_apply(tmp_db):
+    ids = bulk_apply([
+        {"permit_type": "building", "applicant": "Ann", "address": "1 A St"},
+        {"permit_type": "zoning", "applicant": "Ben", "address": "2 B St", "description": "Rezone"},
+    ], db_path=tmp_db)
+    assert len(set(ids)) == 2
+    permits = {p.id: p for p in list_permits(status="pending", db_path=tmp_db)}
+    assert set(permits) == set(ids)
+    assert permits[ids[1]].description == "Rezone"
+
+
+def test_bulk_apply_rejects_unknown_type_without_writing(tmp_db):
+    with pytest.raises(ValueError, match="Unknown permit type"):
+        bulk_apply([
+            {"permit_type": "building", "applicant": "Ann", "address": "1 A St"},
+            {"permit_type": "unicorn_license", "applicant": "Bob", "address": "2 B St"},
+        ], db_path=tmp_db)
+    assert list_permits(db_path=tmp_db) == []
+
+
 def test_approve_permit(tmp_db):
     p = apply("electrical", "Bob", "789 Elm St", db_path=tmp_db)
     approved = approve(p.id, db_path=tmp_db)
@@ -38,6 +106,18 @@ def test_approve_permit(tmp_db):
     assert approved.expires_at is not None
 
 
+def test_event_shares_row_timestamp(tmp_db):
+    import sqlite3
+    p = apply("electrical", "Bea", "790 Elm St", db_path=tmp_db)
+    approved = approve(p.id, db_path=tmp_db)
+    conn = sqlite3.connect(str(tmp_db))
+    events = dict(conn.execute(
+        "SELECT event_type, occurred_at FROM permit_events WHERE permit_id=?", (p.id,)
+    ).fetchall())
+    conn.close()
+    assert events == {"applied": p.created_at, "approved": approved.updated_at}
+
+
 def test_deny_permit(tmp_db):
     p = apply("demolition", "Carol", "321 Pine Rd", db_path=tmp_db)
     denied = deny(p.id, reason="Incomplete application", db_path=tmp_db)
@@ -52,6 +132,11 @@ def test_cannot_approve_denied_permit(tmp_db):
         approve(p.id, db_path=tmp_db)
 
 
+def test_approve_not_found(tmp_db):
+    with pytest.raises(ValueError, match="not found"):
+        approve("missing", db_path=tmp_db)
+
+
 def test_expire_permit(tmp_db):
     p = apply("event", "Eve", "100 Festival Blvd", db_path=tmp_db)
     approve(p.id, db_path=tmp_db)
@@ -74,6 +159,37 @@ def test_expire_overdue(tmp_db):
     assert approved.id in expired_ids
 
 
+def test_epoch_columns_follow_iso_timestamps(tmp_db):
+    import sqlite3
+    p = approve(apply("plumbing", "Hal", "5 Main", db_path=tmp_db).id, db_path=tmp_db)
+    conn = sqlite3.connect(str(tmp_db))
+    row = conn.execute(
+        "SELECT expires_at_ts, created_at_ts FROM permits WHERE id=?", (p.id,)
+    ).fetchone()
+    conn.close()
+    assert row[0] == int(datetime.fromisoformat(p.expires_at).timestamp())
+    assert row[1] == int(datetime.fromisoformat(p.created_at).timestamp())
+
+
+def test_expire_overdue_logs_events_once(tmp_db):
+    import sqlite3
+    ids = []
+    for applicant in ("Fay", "Gus"):
+        p = apply("plumbing", applicant, "1 Pipe Ln", db_path=tmp_db)
+        ids.append(approve(p.id, validity_days=1, db_path=tmp_db).id)
+    conn = sqlite3.connect(str(tmp_db))
+    past = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+    conn.execute("UPDATE permits SET expires_at=?", (past,))
+    conn.commit()
+    assert sorted(expire_overdue(db_path=tmp_db)) == sorted(ids)
+    assert expire_overdue(db_path=tmp_db) == []
+    events = conn.execute(
+        "SELECT permit_id FROM permit_events WHERE event_type='auto_expired'"
+    ).fetchall()
+    conn.close()
+    assert sorted(r[0] for r in events) == sorted(ids)
+
+
 def test_get_permits_by_address(tmp_db):
     apply("zoning", "Grace", "42 Elm Avenue", db_path=tmp_db)
     apply("building", "Henry", "99 Oak Street", db_path=tmp_db)
@@ -84,6 +200,18 @@ def test_get_permits_by_address(tmp_db):
         assert "Elm" in p.address
 
 
+def test_get_permits_by_address_tracks_updates(tmp_db):
+    import sqlite3
+    p = apply("zoning", "Gail", "7 Birch Lane", db_path=tmp_db)
+    assert [r.id for r in get_permits_by_address("Bir", db_path=tmp_db)] == [p.id]
+    conn = sqlite3.connect(str(tmp_db))
+    conn.execute("UPDATE permits SET address='8 Cedar Court' WHERE id=?", (p.id,))
+    conn.commit()
+    conn.close()
+    assert get_permits_by_address("Birch", db_path=tmp_db) == []
+    assert [r.id for r in get_permits_by_address("cedar", db_path=tmp_db)] == [p.id]
+
+
 def test_check_compliance_approved(tmp_db):
     p = apply("mechanical", "Jack", "55 Bridge Rd", db_path=tmp_db)
     approve(p.id, db_path=tmp_db)
@@ -104,6 +232,49 @@ def test_check_compliance_missing_address(tmp_db):
     assert any("MISSING_ADDRESS" in issue for issue in result["issues"])
 
 
+def test_check_compliance_overdue_and_bad_type(tmp_db):
+    import sqlite3
+    p = approve(apply("event", "Ola", "3 Fair Way", db_path=tmp_db).id, db_path=tmp_db)
+    past = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    conn = sqlite3.connect(str(tmp_db))
+    conn.execute("UPDATE permits SET expires_at=?, permit_type='kite' WHERE id=?", (past, p.id))
+    conn.commit()
+    conn.close()
+    result = check_compliance(p.id, db_path=tmp_db)
+    assert result["compliant"] is False
+    assert [i.split(":")[0] for i in result["issues"]] == ["OVERDUE_EXPIRY", "UNKNOWN_TYPE"]
+    assert "'kite'" in result["issues"][1]
+
+
+def test_bulk_compliance_reports_only_failures(tmp_db):
+    import sqlite3
+    ok = approve(apply("mechanical", "Jo", "55 Bridge Rd", db_path=tmp_db).id, db_path=tmp_db)
+    bad = apply("other", "Kim", "100 Test St", db_path=tmp_db)
+    conn = sqlite3.connect(str(tmp_db))
+    conn.execute("UPDATE permits SET address='  ' WHERE id=?", (bad.id,))
+    conn.commit()
+    conn.close()
+    results = bulk_compliance(db_path=tmp_db)
+    assert [r["permit_id"] for r in results] == [bad.id]
+    assert results[0]["issues"] == check_compliance(bad.id, db_path=tmp_db)["issues"]
+    assert check_compliance(ok.id, db_path=tmp_db)["compliant"] is True
+
+
+@pytest.mark.parametrize("address,applicant", [("\t\n", "Kim"), ("100 Test St", "\t"), ("\r\n", "\u00a0\u3000")])
+def test_compliance_treats_all_whitespace_as_blank(tmp_db, address, applicant):
+    import sqlite3
+    p = apply("other", "Kim", "100 Test St", db_path=tmp_db)
+    conn = sqlite3.connect(str(tmp_db))
+    conn.execute("UPDATE permits SET address=?, applicant=? WHERE id=?", (address, applicant, p.id))
+    conn.commit()
+    conn.close()
+    expected = [code for code, value in (("MISSING_ADDRESS", address), ("MISSING_APPLICANT", applicant))
+                if not value.strip()]
+    issues = check_compliance(p.id, db_path=tmp_db)["issues"]
+    assert [i.split(":")[0] for i in issues] == expected
+    assert [r["issues"] for r in bulk_compliance(db_path=tmp_db)] == [issues]
+
+
 def test_send_reminder_within_window(tmp_db):
     p = apply("food_service", "Leo", "77 Cuisine Blvd", db_path=tmp_db)
     import sqlite3
@@ -126,6 +297,25 @@ def test_send_reminder_not_needed(tmp_db):
     assert reminder is None
 
 
+def test_send_reminders_bulk(tmp_db):
+    import sqlite3
+    soon = approve(apply("event", "Nia", "1 Soon St", db_path=tmp_db).id, db_path=tmp_db)
+    later = approve(apply("event", "Ola", "2 Later St", db_path=tmp_db).id, db_path=tmp_db)
+    gone = approve(apply("event", "Pia", "3 Gone St", db_path=tmp_db).id, db_path=tmp_db)
+    apply("event", "Quin", "4 Pending St", db_path=tmp_db)
+    now = datetime.now(timezone.utc)
+    conn = sqlite3.connect(str(tmp_db))
+    for pid, days in ((soon.id, 5), (later.id, 60), (gone.id, -1)):
+        conn.execute("UPDATE permits SET expires_at=? WHERE id=?",
+                     ((now + timedelta(days=days)).isoformat(), pid))
+    conn.commit()
+    conn.close()
+    assert send_reminders_bulk(days_before=30, db_path=tmp_db) == [soon.id]
+    assert send_reminders_bulk(days_before=90, db_path=tmp_db) == [soon.id, later.id]
+    for pid in send_reminders_bulk(days_before=90, db_path=tmp_db):
+        assert send_reminder(pid, days_before=90, db_path=tmp_db) is not None
+
+
 def test_export_csv(tmp_db):
     apply("business_license", "Nora", "100 Business Park", db_path=tmp_db)
     apply("home_occupation", "Oscar", "200 Home Ave", db_path=tmp_db)
@@ -144,6 +334,16 @@ def test_export_csv_filtered_by_status(tmp_db):
     assert "P" not in csv_out or "approved" in csv_out  # only Q is approved
 
 
+def test_export_csv_iter_chunks(tmp_db):
+    for i in range(5):
+        apply("building", f"Owner{i}", f"{i} Chunk St", db_path=tmp_db)
+    chunks = list(export_csv_iter(db_path=tmp_db, chunk_rows=2))
+    assert len(chunks) == 3
+    assert chunks[0].startswith("id,permit_type")
+    assert "".join(chunks) == export_csv(db_path=tmp_db)
+    assert "".join(chunks).count("Chunk St") == 5
+
+
 def test_list_permits(tmp_db):
     apply("signage", "Rita", "10 Sign St", db_path=tmp_db)
     apply("event", "Sam", "20 Event Blvd", db_path=tmp_db)
@@ -156,3 +356,29 @@ def test_list_permits(tmp_db):
 def test_get_permit_not_found(tmp_db):
     result = get_permit("nonexistent", db_path=tmp_db)
     assert result is None
+
+
+def test_reads_do_not_create_database(tmp_db):
+    assert list_permits(db_path=tmp_db) == []
+    assert get_permits_by_address("Elm", db_path=tmp_db) == []
+    assert export_csv(db_path=tmp_db).startswith("id,permit_type")
+    with pytest.raises(ValueError, match="not found"):
+        check_compliance("nonexistent", db_path=tmp_db)
+    assert not tmp_db.exists()
+
+
+@pytest.mark.parametrize("argv", [
+    ["approve", "abc"], ["deny", "abc", "Bad plans"], ["expire", "abc"], ["sweep"],
+    ["search", "Elm"], ["compliance", "abc"], ["reminder", "abc"], ["export"],
+    ["list"], ["show", "abc"],
+])
+def test_cli_fast_path_matches_argparse(argv):
+    from permit_tracker import _fast_args, build_parser
+    assert vars(_fast_args(argv)) == vars(build_parser().parse_args(argv))
+
+
+def test_cli_fast_path_defers_options_to_argparse():
+    from permit_tracker import _fast_args
+    assert _fast_args(["list", "--status", "approved"]) is None
+    assert _fast_args(["show"]) is None
+    assert _fast_args(["apply", "building", "A", "1 St"]) is None
@@ -5,9 +5,9 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from public_records import (
-    create_document, publish, retract, update_document, get_document,
+    create_document, create_documents, delete_documents, publish, retract, update_document, get_document,
     search, list_documents, export_bundle, submit_foia, fulfill_foia,
-    list_foia, VALID_CATEGORIES
+    foia_requests_for_document, list_foia, VALID_CATEGORIES
 )
 
 
@@ -16,6 +16,36 @@ def tmp_db(tmp_path):
     return tmp_path / "test_records.db"
 
 
+def test_init_db_stamps_schema_version_and_upgrades_unstamped(tmp_db):
+    import sqlite3
+    import public_records
+    create_document("Doc", "notice", "body", "clerk", db_path=tmp_db)
+    conn = sqlite3.connect(str(tmp_db))
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == public_records._SCHEMA_VERSION
+    conn.executescript("DROP INDEX idx_foia_status; PRAGMA user_version = 0;")
+    public_records.init_db(conn)
+    assert conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name='idx_foia_status'"
+    ).fetchone()
+    conn.close()
+
+
+def test_close_all_closes_every_connection_when_optimize_fails(tmp_path):
+    import sqlite3
+    import public_records
+    conns = [public_records.get_db(tmp_path / f"db{i}.db") for i in range(2)]
+
+    def broken(sql, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+    conns[0].execute = broken
+    public_records.close_all()
+    assert public_records._CONN_CACHE == {}
+    for conn in conns:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.cursor()
+
+
 def test_create_document(tmp_db):
     doc = create_document("Test Doc", "budget", "Body text", "admin",
                           tags="finance,q1", db_path=tmp_db)
@@ -25,6 +55,81 @@ def test_create_document(tmp_db):
     assert doc.version == 1
 
 
+@pytest.mark.parametrize("write", [
+    lambda db: create_document("Dup", "notice", "body", "clerk", db_path=db),
+    lambda db: submit_foia("Citizen", "All notices", db_path=db),
+], ids=["create_document", "submit_foia"])
+def test_failed_insert_rolls_back_shared_connection(tmp_db, monkeypatch, write):
+    import sqlite3
+    import uuid
+    import public_records
+    monkeypatch.setattr(public_records.uuid, "uuid4", lambda: uuid.UUID(int=0))
+    write(tmp_db)
+    with pytest.raises(sqlite3.IntegrityError):
+        write(tmp_db)
+    assert not public_records.get_db(tmp_db).in_transaction
+    # No write lock is left behind for other connections to trip over.
+    other = sqlite3.connect(str(tmp_db), timeout=0)
+    with other:
+        other.execute("DELETE FROM documents WHERE id='nothing'")
+    other.close()
+
+
+def test_writer_transactions_are_serialized_across_threads(tmp_db):
+    import threading
+    import public_records
+    create_document("First", "notice", "body", "clerk", db_path=tmp_db)
+    done = threading.Event()
+
+    def write():
+        create_document("Second", "notice", "body", "clerk", db_path=tmp_db)
+        done.set()
+
+    with public_records.get_db(tmp_db):
+        t = threading.Thread(target=write)
+        t.start()
+        assert not done.wait(0.2)  # held back until this transaction ends
+    t.join(5)
+    assert done.is_set()
+    assert len(list_documents(db_path=tmp_db)) == 2
+
+
+def test_create_documents(tmp_db):
+    docs = create_documents([
+        {"title": "Agenda 1", "category": "agenda", "body": "roll call", "author": "clerk"},
+        {"title": "Agenda 2", "category": "agenda", "body": "budget vote", "author": "clerk",
+         "tags": "finance", "is_public": True},
+    ], db_path=tmp_db)
+    assert len({d.id for d in docs}) == 2
+    assert [d.title for d in search("budget", db_path=tmp_db)] == ["Agenda 2"]
+    assert len(list_documents(category="agenda", db_path=tmp_db)) == 2
+
+
+def test_create_documents_rejects_unknown_category_without_writing(tmp_db):
+    with pytest.raises(ValueError, match="Unknown category"):
+        create_documents([
+            {"title": "Ok", "category": "agenda", "body": "", "author": "clerk"},
+            {"title": "Bad", "category": "secret_category", "body": "", "author": "clerk"},
+        ], db_path=tmp_db)
+    assert list_documents(db_path=tmp_db) == []
+
+
+def test_column_lists_follow_field_order():
+    import public_records
+    from dataclasses import fields
+    for columns, cls in ((public_records._DOC_COLUMNS, public_records.Document),
+                         (public_records._FOIA_COLUMNS, public_records.FoiaRequest)):
+        assert columns.split(", ") == [f.name for f in fields(cls)]
+
+
+def test_records_are_slotted(tmp_db):
+    doc = create_document("Slots", "other", "body", "admin", db_path=tmp_db)
+    req = submit_foia("Jane Doe", "Slots", db_path=tmp_db)
+    for obj in (doc, req):
+        assert not hasattr(obj, "__dict__")
+        assert list(obj.to_dict()) == list(obj.__slots__)
+
+
 def test_invalid_category(tmp_db):
     with pytest.raises(ValueError, match="Unknown category"):
         create_document("Bad", "secret_category", "body", "user", db_path=tmp_db)
@@ -69,6 +174,35 @@ def test_update_document_bumps_version(tmp_db):
     assert updated.body == "New body"
 
 
+def test_update_document_returns_stored_row(tmp_db):
+    doc = create_document("Draft", "policy", "v1", "author", tags="a", db_path=tmp_db)
+    updated = update_document(doc.id, body="v2", db_path=tmp_db)
+    assert updated == get_document(doc.id, db_path=tmp_db)
+    assert updated.title == "Draft"
+    assert updated.tags == "a"
+    assert update_document(doc.id, tags="", db_path=tmp_db).tags == ""
+
+
+def test_mutations_on_missing_records_raise(tmp_db):
+    for fn in (publish, retract, update_document):
+        with pytest.raises(ValueError, match="not found"):
+            fn("nonexistent", db_path=tmp_db)
+    with pytest.raises(ValueError, match="not found"):
+        fulfill_foia("nonexistent", "n/a", db_path=tmp_db)
+
+
+def test_update_document_revision_shares_timestamp(tmp_db):
+    import sqlite3
+    doc = create_document("Draft", "policy", "v1", "author", db_path=tmp_db)
+    updated = update_document(doc.id, body="v2", editor="clerk", db_path=tmp_db)
+    conn = sqlite3.connect(str(tmp_db))
+    rev = conn.execute(
+        "SELECT version, body, edited_by, edited_at FROM document_revisions WHERE id=?", (doc.id,)
+    ).fetchone()
+    conn.close()
+    assert rev == (1, "v1", "clerk", updated.updated_at)
+
+
 def test_search_by_keyword(tmp_db):
     create_document("Budget 2025", "budget", "fiscal year allocation", "finance",
                     is_public=True, db_path=tmp_db)
@@ -90,6 +224,98 @@ def test_search_private_excluded_by_default(tmp_db):
     assert "Private Doc" not in titles
 
 
+def test_search_filters_by_category(tmp_db):
+    create_document("Budget Notice", "notice", "water rates", "clerk",
+                    is_public=True, db_path=tmp_db)
+    create_document("Budget Report", "report", "water rates", "clerk",
+                    is_public=True, db_path=tmp_db)
+    results = search("water", category="report", db_path=tmp_db)
+    assert [r.title for r in results] == ["Budget Report"]
+    assert len(search("water", db_path=tmp_db)) == 2
+
+
+def test_search_treats_fts_syntax_as_text(tmp_db):
+    create_document("Road Works", "notice", "closure AND( detour", "clerk",
+                    is_public=True, db_path=tmp_db)
+    assert [r.title for r in search("AND(", db_path=tmp_db)] == ["Road Works"]
+    assert [r.title for r in search('"detour', db_path=tmp_db)] == []
+
+
+def test_search_matches_substrings_of_every_word(tmp_db):
+    create_document("Water Rates", "notice", "wastewater surcharge", "clerk",
+                    is_public=True, db_path=tmp_db)
+    create_document("Rate Card", "notice", "parking surcharge", "clerk",
+                    is_public=True, db_path=tmp_db)
+    assert [r.title for r in search("water charge", db_path=tmp_db)] == ["Water Rates"]
+    assert len(search("SURCHARGE", db_path=tmp_db)) == 2
+    # Words shorter than the trigram width fall back to a substring scan.
+    assert [r.title for r in search("rd", db_path=tmp_db)] == ["Rate Card"]
+
+
+def test_search_mixes_short_and_long_words(tmp_db):
+    for title, body in [
+        ("Ward Notice", "water main flushing, water water"),
+        ("Water Rates", "wastewater surcharge"),
+        ("Rate Card", "parking surcharge"),
+        ("Third Ward", "water board meets"),
+    ]:
+        create_document(title, "notice", body, "clerk", is_public=True, db_path=tmp_db)
+    ranked = [r.title for r in search("water", db_path=tmp_db)]
+    # Every word must match, in the same rank order as the indexed search.
+    assert [r.title for r in search("rd water", db_path=tmp_db)] == [
+        t for t in ranked if t in ("Ward Notice", "Third Ward")
+    ]
+    assert [r.title for r in search("ca rd", db_path=tmp_db)] == ["Rate Card"]
+    assert search("rd xq", db_path=tmp_db) == []
+    # LIKE wildcards in short words are literal.
+    assert search("%", db_path=tmp_db) == []
+    assert search("_", db_path=tmp_db) == []
+
+
+def test_search_index_upgraded_from_word_tokenizer(tmp_db):
+    import sqlite3
+    import public_records
+    doc = create_document("Water Rates", "notice", "wastewater", "clerk",
+                          is_public=True, db_path=tmp_db)
+    public_records.close_all()
+    conn = sqlite3.connect(str(tmp_db))
+    conn.executescript("""
+        DROP TABLE documents_fts;
+        CREATE VIRTUAL TABLE documents_fts
+            USING fts5(id UNINDEXED, title, body, tags, content='documents', content_rowid='rowid');
+        INSERT INTO documents_fts(documents_fts) VALUES ('rebuild');
+        PRAGMA user_version = 1;
+    """)
+    conn.close()
+    assert [r.id for r in search("stewat", db_path=tmp_db)] == [doc.id]
+
+
+def test_search_sees_updated_content(tmp_db):
+    doc = create_document("Draft", "policy", "parking rules", "clerk",
+                          is_public=True, db_path=tmp_db)
+    update_document(doc.id, body="cycling rules", db_path=tmp_db)
+    assert search("parking", db_path=tmp_db) == []
+    assert [r.id for r in search("cycling", db_path=tmp_db)] == [doc.id]
+
+
+def test_delete_documents_clears_search_index(tmp_db):
+    keep = create_document("Keep", "notice", "harbour dredging", "clerk",
+                           is_public=True, db_path=tmp_db)
+    docs = create_documents([
+        {"title": f"Old {i}", "category": "notice", "body": "harbour dredging",
+         "author": "clerk", "is_public": True}
+        for i in range(3)
+    ], db_path=tmp_db)
+    update_document(docs[0].id, body="harbour dredging phase 2", db_path=tmp_db)
+    assert delete_documents([d.id for d in docs] + ["nonexistent"], db_path=tmp_db) == 3
+    assert [r.id for r in search("harbour", db_path=tmp_db)] == [keep.id]
+    # A new document may reuse a freed rowid; it must not inherit old postings.
+    fresh = create_document("Fresh", "notice", "library hours", "clerk",
+                            is_public=True, db_path=tmp_db)
+    assert [r.id for r in search("harbour", db_path=tmp_db)] == [keep.id]
+    assert [r.id for r in search("library", db_path=tmp_db)] == [fresh.id]
+
+
 def test_list_by_category(tmp_db):
     create_document("Budget A", "budget", "...", "user", db_path=tmp_db)
     create_document("Budget B", "budget", "...", "user", db_path=tmp_db)
@@ -111,6 +337,34 @@ def test_export_bundle(tmp_db, tmp_path):
         names = zf.namelist()
         assert "index.csv" in names
         assert len([n for n in names if n.endswith(".json")]) == 2
+        index = zf.read("index.csv").decode("utf-8").splitlines()
+    assert index[0] == "id,title,author,created_at,version,file"
+    assert sorted(line.split(",")[1] for line in index[1:]) == ["Contract A", "Contract B"]
+
+
+def test_export_bundle_fast_compression(tmp_db, tmp_path):
+    import zipfile
+    create_document("Contract A", "contract", "Terms " * 200, "legal",
+                    is_public=True, db_path=tmp_db)
+    out_path = str(tmp_path / "fast.zip")
+    assert export_bundle("contract", out_path, compresslevel=1, db_path=tmp_db) == out_path
+    with zipfile.ZipFile(out_path) as zf:
+        assert zf.testzip() is None
+        assert all(i.compress_type == zipfile.ZIP_DEFLATED for i in zf.infolist())
+
+
+def test_export_bundle_flattens_titles_with_separators(tmp_db, tmp_path):
+    import json
+    import zipfile
+    from dataclasses import asdict
+    doc = create_document("Lease 1/2 ..\\annex", "contract", "Terms", "legal",
+                          is_public=True, db_path=tmp_db)
+    out_path = str(tmp_path / "contracts.zip")
+    export_bundle("contract", out_path, db_path=tmp_db)
+    with zipfile.ZipFile(out_path) as zf:
+        member = f"{doc.id}_Lease_1_2_.._annex.json"
+        assert member in zf.namelist()
+        assert json.loads(zf.read(member)) == asdict(doc)
 
 
 def test_export_bundle_empty_raises(tmp_db, tmp_path):
@@ -135,6 +389,36 @@ def test_foia_fulfill(tmp_db):
     assert "Records provided." in fulfilled.response
 
 
+def test_foia_requests_for_document(tmp_db):
+    doc = create_document("Payroll", "report", "Staff costs", "hr", db_path=tmp_db)
+    other = create_document("Roster", "report", "Shifts", "hr", db_path=tmp_db)
+    req1 = submit_foia("Ann", "Payroll records", db_path=tmp_db)
+    req2 = submit_foia("Ben", "Everything", db_path=tmp_db)
+    fulfill_foia(req1.id, "Attached.", doc_ids=[doc.id], db_path=tmp_db)
+    fulfilled = fulfill_foia(req2.id, "Attached.", doc_ids=[doc.id, other.id, doc.id],
+                             db_path=tmp_db)
+    assert fulfilled.document_ids == f'["{doc.id}", "{other.id}"]'
+    assert {r.id for r in foia_requests_for_document(doc.id, db_path=tmp_db)} == {req1.id, req2.id}
+    # Re-fulfilling replaces the linked documents.
+    fulfill_foia(req2.id, "Corrected.", doc_ids=[other.id], db_path=tmp_db)
+    assert [r.id for r in foia_requests_for_document(doc.id, db_path=tmp_db)] == [req1.id]
+
+
+def test_foia_links_backfilled_from_json(tmp_db):
+    import sqlite3
+    import public_records
+    req = submit_foia("Ann", "Old request", db_path=tmp_db)
+    public_records.close_all()
+    conn = sqlite3.connect(str(tmp_db))
+    conn.executescript(f"""
+        DROP TABLE foia_documents;
+        UPDATE foia_requests SET document_ids='["d1", "d2"]' WHERE id='{req.id}';
+        PRAGMA user_version = 2;
+    """)
+    conn.close()
+    assert [r.id for r in foia_requests_for_document("d2", db_path=tmp_db)] == [req.id]
+
+
 def test_foia_list(tmp_db):
     submit_foia("Req1", "First request", db_path=tmp_db)
     submit_foia("Req2", "Second request", db_path=tmp_db)
@@ -154,3 +438,30 @@ def test_all_valid_categories_accepted(tmp_db):
     for cat in VALID_CATEGORIES:
         doc = create_document(f"Doc {cat}", cat, "body", "user", db_path=tmp_db)
         assert doc.category == cat
+
+
+@pytest.mark.parametrize("argv", [
+    ["publish", "abc"], ["retract", "abc"], ["get", "abc"], ["search", "budget"],
+    ["list"], ["foia-submit", "Jane", "All minutes"], ["foia-fulfill", "abc", "Done"],
+    ["foia-list"],
+])
+def test_cli_fast_path_matches_argparse(argv):
+    from public_records import _fast_args, build_parser
+    assert vars(_fast_args(argv)) == vars(build_parser().parse_args(argv))
+
+
+def test_cli_fast_path_defers_options_to_argparse():
+    from public_records import _fast_args
+    assert _fast_args(["list", "--public"]) is None
+    assert _fast_args(["get"]) is None
+    assert _fast_args(["create", "T", "budget", "me"]) is None
+
+
+def test_cli_create_honours_public_flag(tmp_db, monkeypatch, capsys):
+    import functools
+    import json
+    import public_records
+    monkeypatch.setattr(public_records, "create_document",
+                        functools.partial(create_document, db_path=tmp_db))
+    public_records.main(["create", "CLI Doc", "notice", "clerk", "--public"])
+    assert json.loads(capsys.readouterr().out)["is_public"] is True
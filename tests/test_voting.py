@@ -1,4 +1,5 @@
 """Tests for voting_system.py"""
+import json
 import pytest
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
@@ -7,8 +8,9 @@ import tempfile
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from voting_system import (
-    create_ballot, register_voter, cast_vote, tally, export_results,
-    close_ballot, list_ballots, validate_eligibility, verify_vote, get_ballot
+    create_ballot, register_voter, register_voters, cast_vote, cast_votes, tally, export_results,
+    close_ballot, list_ballots, validate_eligibility, verify_vote, verify_ballot, get_ballot,
+    export_results_iter,
 )
 
 
@@ -17,11 +19,62 @@ def tmp_db(tmp_path):
     return tmp_path / "test_voting.db"
 
 
+# Sampled once: the voting windows the tests build are at least an hour wide,
+# far longer than the suite takes to run.
+_NOW = datetime.now(timezone.utc)
+
+
 def _future(hours=2):
-    return (datetime.now(timezone.utc) + timedelta(hours=hours)).isoformat()
+    return (_NOW + timedelta(hours=hours)).isoformat()
 
 def _past(hours=2):
-    return (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+    return (_NOW - timedelta(hours=hours)).isoformat()
+
+
+@pytest.fixture
+def basic_ballot(tmp_db):
+    """An open Yes/No ballot in a fresh database."""
+    return create_ballot("T", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+
+
+def test_connection_uses_wal_unless_durable(tmp_path):
+    from voting_system import get_db
+    fast = get_db(tmp_path / "fast.db")
+    durable = get_db(tmp_path / "durable.db", durable=True)
+    assert fast.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert fast.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert durable.execute("PRAGMA synchronous").fetchone()[0] == 2
+
+
+def test_init_db_skips_stamped_database(tmp_db):
+    import sqlite3
+    import voting_system
+    create_ballot("Stamp", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+    conn = sqlite3.connect(str(tmp_db))
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == voting_system._SCHEMA_VERSION
+    conn.execute("DROP INDEX idx_votes_ballot_choice")
+    voting_system.init_db(conn)
+    assert not conn.execute("SELECT 1 FROM sqlite_master WHERE name='idx_votes_ballot_choice'").fetchone()
+    conn.execute("PRAGMA user_version = 0")
+    voting_system.init_db(conn)
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name='idx_votes_ballot_choice'").fetchone()
+    conn.close()
+
+
+def test_read_conn_pools_read_only_connections(tmp_db):
+    import sqlite3
+    from voting_system import read_conn
+    b = create_ballot("Pool", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+    with read_conn(tmp_db) as outer:
+        with read_conn(tmp_db) as inner:
+            assert inner is not outer
+        assert outer.execute("SELECT title FROM ballots").fetchone()[0] == "Pool"
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            outer.execute("DELETE FROM ballots")
+    with read_conn(tmp_db) as again:
+        assert again is outer
+    register_voter("late", b.id, db_path=tmp_db)
+    assert validate_eligibility("late", b.id, db_path=tmp_db) is True
 
 
 def test_create_ballot(tmp_db):
@@ -44,8 +97,16 @@ def test_register_and_validate_eligibility(tmp_db):
     assert validate_eligibility("voter1", b.id, db_path=tmp_db) is True
 
 
-def test_cast_vote(tmp_db):
-    b = create_ballot("Vote Test", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+def test_register_voters_batch(tmp_db):
+    b = create_ballot("Roll", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+    register_voter("v0", b.id, db_path=tmp_db)
+    register_voters(((f"v{i}", b.id) for i in range(3)), db_path=tmp_db)
+    assert all(validate_eligibility(f"v{i}", b.id, db_path=tmp_db) for i in range(3))
+    assert validate_eligibility("v3", b.id, db_path=tmp_db) is False
+
+
+def test_cast_vote(tmp_db, basic_ballot):
+    b = basic_ballot
     register_voter("alice", b.id, db_path=tmp_db)
     vote = cast_vote(b.id, "alice", "Yes", db_path=tmp_db)
     assert vote.voter_id == "alice"
@@ -53,22 +114,69 @@ def test_cast_vote(tmp_db):
     assert len(vote.signature) == 64  # sha256 hex
 
 
-def test_double_vote_prevented(tmp_db):
-    b = create_ballot("Double Vote", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+def test_double_vote_prevented(tmp_db, basic_ballot):
+    b = basic_ballot
     register_voter("bob", b.id, db_path=tmp_db)
     cast_vote(b.id, "bob", "Yes", db_path=tmp_db)
     with pytest.raises(ValueError, match="already voted"):
         cast_vote(b.id, "bob", "No", db_path=tmp_db)
 
 
-def test_ineligible_voter_rejected(tmp_db):
-    b = create_ballot("Eligibility Check", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+def test_ineligible_voter_rejected(tmp_db, basic_ballot):
+    b = basic_ballot
     with pytest.raises(ValueError, match="not registered"):
         cast_vote(b.id, "stranger", "Yes", db_path=tmp_db)
 
 
-def test_invalid_choice_rejected(tmp_db):
-    b = create_ballot("Choice Test", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+def test_writer_transactions_are_serialized_across_threads(tmp_db, basic_ballot):
+    import threading
+    import voting_system
+    register_voter("t1", basic_ballot.id, db_path=tmp_db)
+    done = threading.Event()
+
+    def vote():
+        cast_vote(basic_ballot.id, "t1", "Yes", db_path=tmp_db)
+        done.set()
+
+    with voting_system.get_db(tmp_db):
+        t = threading.Thread(target=vote)
+        t.start()
+        assert not done.wait(0.2)  # held back until this transaction ends
+    t.join(5)
+    assert done.is_set()
+    assert tally(basic_ballot.id, db_path=tmp_db)["total_votes"] == 1
+
+
+def test_cast_vote_validates_under_the_write_lock(tmp_db, basic_ballot, monkeypatch):
+    import sqlite3
+    import voting_system
+    register_voter("w1", basic_ballot.id, db_path=tmp_db)
+    real_new_vote = voting_system._new_vote
+    seen = []
+
+    def checked(conn, *args):
+        seen.append(conn.in_transaction)
+        # Another process cannot close the ballot between the check and the insert.
+        other = sqlite3.connect(str(tmp_db), timeout=0)
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            with other:
+                other.execute("UPDATE ballots SET is_active=0 WHERE id=?", (basic_ballot.id,))
+        other.close()
+        return real_new_vote(conn, *args)
+
+    monkeypatch.setattr(voting_system, "_new_vote", checked)
+    cast_vote(basic_ballot.id, "w1", "Yes", db_path=tmp_db)
+    assert seen == [True]
+    assert get_ballot(basic_ballot.id, db_path=tmp_db)["is_active"] is True
+
+
+def test_unknown_ballot_rejected(tmp_db):
+    with pytest.raises(ValueError, match="not found"):
+        cast_vote("nope", "voter", "Yes", db_path=tmp_db)
+
+
+def test_invalid_choice_rejected(tmp_db, basic_ballot):
+    b = basic_ballot
     register_voter("voter", b.id, db_path=tmp_db)
     with pytest.raises(ValueError, match="Invalid choice"):
         cast_vote(b.id, "voter", "Maybe", db_path=tmp_db)
@@ -76,10 +184,9 @@ def test_invalid_choice_rejected(tmp_db):
 
 def test_tally(tmp_db):
     b = create_ballot("Tally Test", "", ["A", "B", "C"], _past(1), _future(2), db_path=tmp_db)
-    for i, choice in enumerate(["A", "A", "B"]):
-        voter = f"v{i}"
-        register_voter(voter, b.id, db_path=tmp_db)
-        cast_vote(b.id, voter, choice, db_path=tmp_db)
+    choices = ["A", "A", "B"]
+    register_voters([(f"v{i}", b.id) for i in range(len(choices))], db_path=tmp_db)
+    cast_votes([(b.id, f"v{i}", choice) for i, choice in enumerate(choices)], db_path=tmp_db)
     result = tally(b.id, db_path=tmp_db)
     assert result["total_votes"] == 3
     assert result["counts"]["A"] == 2
@@ -87,6 +194,18 @@ def test_tally(tmp_db):
     assert result["winner"] == "A"
 
 
+def test_cast_votes_is_all_or_nothing(tmp_db):
+    b = create_ballot("Batch", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+    register_voters([("b1", b.id), ("b2", b.id)], db_path=tmp_db)
+    with pytest.raises(ValueError, match="not registered"):
+        cast_votes([(b.id, "b1", "Yes"), (b.id, "b3", "No")], db_path=tmp_db)
+    with pytest.raises(ValueError, match="'b2' has already voted"):
+        cast_votes([(b.id, "b1", "Yes"), (b.id, "b2", "No"), (b.id, "b2", "Yes")], db_path=tmp_db)
+    assert tally(b.id, db_path=tmp_db)["total_votes"] == 0
+    cast_votes([(b.id, "b1", "Yes"), (b.id, "b2", "No")], db_path=tmp_db)
+    assert tally(b.id, db_path=tmp_db)["counts"] == {"Yes": 1, "No": 1}
+
+
 def test_tally_empty_ballot(tmp_db):
     b = create_ballot("Empty", "", ["X", "Y"], _past(1), _future(2), db_path=tmp_db)
     result = tally(b.id, db_path=tmp_db)
@@ -99,7 +218,7 @@ def test_export_json(tmp_db):
     register_voter("v1", b.id, db_path=tmp_db)
     cast_vote(b.id, "v1", "Yes", db_path=tmp_db)
     output = export_results(b.id, fmt="json", db_path=tmp_db)
-    data = __import__("json").loads(output)
+    data = json.loads(output)
     assert "summary" in data
     assert "votes" in data
     assert data["summary"]["total_votes"] == 1
@@ -114,6 +233,45 @@ def test_export_csv(tmp_db):
     assert "v1" in output
 
 
+@pytest.mark.parametrize("n_votes", [0, 5])
+def test_export_iter_matches_materialized_output(tmp_db, n_votes):
+    import csv
+    import io
+    b = create_ballot("Stream", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+    voters = [f'v{i} "é"\\' for i in range(n_votes)]
+    register_voters([(v, b.id) for v in voters], db_path=tmp_db)
+    votes = cast_votes([(b.id, v, "Yes") for v in voters], db_path=tmp_db)
+
+    text = "".join(export_results_iter(b.id, fmt="json", db_path=tmp_db, chunk_rows=2))
+    expected = {"summary": tally(b.id, db_path=tmp_db), "votes": [v.__dict__ for v in votes]}
+    assert text == json.dumps(expected, indent=2)
+
+    chunks = list(export_results_iter(b.id, fmt="csv", db_path=tmp_db, chunk_rows=2))
+    assert len(chunks) == max(1, -(-n_votes // 2))
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == ["voter_id", "ballot_id", "choice", "timestamp", "signature"]
+    assert [r[0] for r in rows[1:]] == [v.voter_id for v in votes]
+
+
+@pytest.mark.parametrize("ballot,fmt", [("BADID", "json"), (None, "xml")])
+def test_cli_export_keeps_existing_file_on_error(tmp_db, tmp_path, monkeypatch, ballot, fmt):
+    import argparse
+    import functools
+    import voting_system
+    b = create_ballot("Keep", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+    monkeypatch.setattr(voting_system, "export_results_iter",
+                        functools.partial(voting_system.export_results_iter, db_path=tmp_db))
+    out = tmp_path / "results.json"
+    out.write_text("previous export")
+    args = argparse.Namespace(ballot_id=ballot or b.id, format=fmt, output=str(out))
+    with pytest.raises(ValueError):
+        voting_system.cmd_export(args)
+    assert out.read_text() == "previous export"
+
+    voting_system.cmd_export(argparse.Namespace(ballot_id=b.id, format="json", output=str(out)))
+    assert json.loads(out.read_text())["summary"]["ballot_id"] == b.id
+
+
 def test_close_ballot(tmp_db):
     b = create_ballot("Closeable", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
     register_voter("v1", b.id, db_path=tmp_db)
@@ -124,8 +282,8 @@ def test_close_ballot(tmp_db):
         cast_vote(b.id, "v1", "Yes", db_path=tmp_db)
 
 
-def test_verify_vote_signature(tmp_db):
-    b = create_ballot("Sig Test", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+def test_verify_vote_signature(tmp_db, basic_ballot):
+    b = basic_ballot
     register_voter("sv1", b.id, db_path=tmp_db)
     vote = cast_vote(b.id, "sv1", "Yes", db_path=tmp_db)
     assert verify_vote(vote) is True
@@ -133,6 +291,61 @@ def test_verify_vote_signature(tmp_db):
     assert verify_vote(vote) is False
 
 
+def test_signing_key_changes_signatures(tmp_db, monkeypatch):
+    import hmac
+    import voting_system
+    b = create_ballot("Keyed", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+    register_voters([("k1", b.id), ("k2", b.id)], db_path=tmp_db)
+    plain = cast_vote(b.id, "k1", "Yes", db_path=tmp_db)
+    monkeypatch.setattr(voting_system, "_SIGN_HMAC", hmac.new(b"s3cret", digestmod="sha256"))
+    keyed = cast_vote(b.id, "k2", "Yes", db_path=tmp_db)
+    assert len(keyed.signature) == 64
+    assert verify_vote(keyed) is True
+    assert verify_vote(plain) is False
+    assert verify_ballot(b.id, db_path=tmp_db)["invalid"] == [{"id": plain.id, "voter_id": "k1"}]
+
+
+def test_sign_and_verify_ballot_share_message_format(tmp_db, basic_ballot, monkeypatch):
+    import voting_system
+    monkeypatch.setattr(voting_system, "_signed_message", lambda *parts: "|".join(parts).encode())
+    register_voter("m1", basic_ballot.id, db_path=tmp_db)
+    vote = cast_vote(basic_ballot.id, "m1", "Yes", db_path=tmp_db)
+    assert verify_vote(vote) is True
+    assert verify_ballot(basic_ballot.id, db_path=tmp_db)["invalid"] == []
+
+
+def test_verify_ballot_flags_tampered_votes(tmp_db):
+    import sqlite3
+    b = create_ballot("Audit", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+    register_voters([("a1", b.id), ("a2", b.id)], db_path=tmp_db)
+    cast_vote(b.id, "a1", "Yes", db_path=tmp_db)
+    forged = cast_vote(b.id, "a2", "Yes", db_path=tmp_db)
+    assert verify_ballot(b.id, db_path=tmp_db) == {"ballot_id": b.id, "total_votes": 2, "invalid": []}
+    conn = sqlite3.connect(str(tmp_db))
+    conn.execute("UPDATE votes SET choice='No' WHERE id=?", (forged.id,))
+    conn.commit()
+    conn.close()
+    result = verify_ballot(b.id, db_path=tmp_db)
+    assert result["invalid"] == [{"id": forged.id, "voter_id": "a2"}]
+
+
+def test_verify_ballot_parallel_path(tmp_db, monkeypatch):
+    import sqlite3
+    import voting_system
+    monkeypatch.setattr(voting_system, "_VERIFY_CHUNK_ROWS", 2)
+    monkeypatch.setattr(voting_system, "_VERIFY_PARALLEL_MIN_ROWS", 3)
+    b = create_ballot("Big", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+    register_voters([(f"p{i}", b.id) for i in range(5)], db_path=tmp_db)
+    votes = cast_votes([(b.id, f"p{i}", "Yes") for i in range(5)], db_path=tmp_db)
+    conn = sqlite3.connect(str(tmp_db))
+    conn.execute("UPDATE votes SET choice='No' WHERE id IN (?, ?)", (votes[1].id, votes[4].id))
+    conn.commit()
+    conn.close()
+    result = verify_ballot(b.id, db_path=tmp_db, workers=2)
+    assert result["total_votes"] == 5
+    assert result["invalid"] == [{"id": votes[1].id, "voter_id": "p1"}, {"id": votes[4].id, "voter_id": "p4"}]
+
+
 def test_list_ballots(tmp_db):
     create_ballot("B1", "", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
     create_ballot("B2", "", ["A", "B"], _past(1), _future(2), db_path=tmp_db)
@@ -140,15 +353,66 @@ def test_list_ballots(tmp_db):
     assert len(ballots) == 2
 
 
-def test_voting_window_not_open(tmp_db):
-    b = create_ballot("Future Vote", "", ["Yes", "No"], _future(1), _future(3), db_path=tmp_db)
-    register_voter("early", b.id, db_path=tmp_db)
-    with pytest.raises(ValueError, match="not opened yet"):
-        cast_vote(b.id, "early", "Yes", db_path=tmp_db)
+def test_list_ballots_matches_get_ballot(tmp_db):
+    first = create_ballot("Old", "d", ["Yes", "No"], _past(1), _future(2), db_path=tmp_db)
+    second = create_ballot("New", "", ["C", "A", "B"], _past(1), _future(2), db_path=tmp_db)
+    close_ballot(first.id, db_path=tmp_db)
+    ballots = list_ballots(db_path=tmp_db)
+    assert [b["id"] for b in ballots] == [second.id, first.id]
+    for b in ballots:
+        expected = get_ballot(b["id"], db_path=tmp_db)
+        assert list(b.items()) == list(expected.items())
+    assert ballots[1]["is_active"] is False
+
+
+def test_legacy_database_is_upgraded(tmp_db):
+    import sqlite3
+    conn = sqlite3.connect(str(tmp_db))
+    conn.executescript("""
+        CREATE TABLE ballots (id TEXT PRIMARY KEY, title TEXT NOT NULL, description TEXT,
+            options TEXT NOT NULL, start_time TEXT NOT NULL, end_time TEXT NOT NULL,
+            is_active INTEGER DEFAULT 1, created_at TEXT NOT NULL);
+    """)
+    conn.execute("INSERT INTO ballots VALUES (?,?,?,?,?,?,?,?)",
+                 ("old1", "Legacy", "", json.dumps(["No", "Yes"]), _past(1), _future(2), 1, _past(1)))
+    conn.commit()
+    conn.close()
+    assert get_ballot("old1", db_path=tmp_db)["options"] == ["No", "Yes"]
+    register_voter("v1", "old1", db_path=tmp_db)
+    with pytest.raises(ValueError, match="Valid: \\['No', 'Yes'\\]"):
+        cast_vote("old1", "v1", "Maybe", db_path=tmp_db)
+    assert cast_vote("old1", "v1", "Yes", db_path=tmp_db).choice == "Yes"
+
+
+@pytest.mark.parametrize("start,end,msg", [
+    (_future(1), _future(3), "not opened yet"),
+    (_past(4), _past(1), "closed"),
+])
+def test_voting_window_enforced(tmp_db, start, end, msg):
+    b = create_ballot("Window", "", ["Yes", "No"], start, end, db_path=tmp_db)
+    register_voter("voter", b.id, db_path=tmp_db)
+    with pytest.raises(ValueError, match=msg):
+        cast_vote(b.id, "voter", "Yes", db_path=tmp_db)
 
 
-def test_voting_window_closed(tmp_db):
-    b = create_ballot("Past Vote", "", ["Yes", "No"], _past(4), _past(1), db_path=tmp_db)
-    register_voter("late", b.id, db_path=tmp_db)
-    with pytest.raises(ValueError, match="closed"):
-        cast_vote(b.id, "late", "Yes", db_path=tmp_db)
+def test_voting_window_with_utc_offset(tmp_db):
+    plus5 = timezone(timedelta(hours=5))
+    start = (datetime.now(plus5) - timedelta(minutes=30)).isoformat()
+    end = (datetime.now(plus5) + timedelta(hours=1)).isoformat()
+    b = create_ballot("Offset Vote", "", ["Yes", "No"], start, end, db_path=tmp_db)
+    register_voter("tz", b.id, db_path=tmp_db)
+    assert cast_vote(b.id, "tz", "Yes", db_path=tmp_db).choice == "Yes"
+
+
+def test_voting_window_with_z_suffix(tmp_db):
+    start = (_NOW - timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    end = (_NOW + timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    b = create_ballot("Zulu Vote", "", ["Yes", "No"], start, end, db_path=tmp_db)
+    assert b.start_time == start
+    register_voter("z", b.id, db_path=tmp_db)
+    assert cast_vote(b.id, "z", "Yes", db_path=tmp_db).choice == "Yes"
+
+
+def test_invalid_voting_window_rejected(tmp_db):
+    with pytest.raises(ValueError, match="Invalid voting window"):
+        create_ballot("Bad Window", "", ["Yes", "No"], "tomorrow", _future(2), db_path=tmp_db)
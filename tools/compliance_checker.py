@@ -3,116 +3,278 @@
 BlackRoad Compliance Checker — automated SOC2/GDPR/CCPA compliance scanning.
 """
 
-import json
-import subprocess
+import fnmatch
+import functools
 import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass
 from pathlib import Path
-from datetime import datetime
-
-
-CHECKS = {
-    "soc2": {
-        "CC1.1": {
-            "name": "Security Policy Exists",
-            "check": lambda: Path("SECURITY.md").exists() or Path("docs/security.md").exists(),
-            "remediation": "Create SECURITY.md documenting security policies"
-        },
-        "CC2.1": {
-            "name": "Change Management Process",
-            "check": lambda: Path(".github/PULL_REQUEST_TEMPLATE.md").exists(),
-            "remediation": "Add .github/PULL_REQUEST_TEMPLATE.md"
-        },
-        "CC6.1": {
-            "name": "Encryption in Transit",
-            "check": lambda: _check_https_in_configs(),
-            "remediation": "Ensure all service URLs use HTTPS"
-        },
-        "CC6.7": {
-            "name": "No Hardcoded Secrets",
-            "check": lambda: not _check_hardcoded_secrets(),
-            "remediation": "Remove all hardcoded API keys, tokens, passwords"
-        },
-        "CC7.1": {
-            "name": ".gitignore Exists",
-            "check": lambda: Path(".gitignore").exists(),
-            "remediation": "Create .gitignore with .env, *.key, secrets/"
-        },
-    },
-    "gdpr": {
-        "GDPR-7": {
-            "name": "Privacy Policy Linked",
-            "check": lambda: any(Path(".").glob("**/PRIVACY*")),
-            "remediation": "Add PRIVACY.md or link to privacy policy"
-        },
-        "GDPR-17": {
-            "name": "Data Deletion Process",
-            "check": lambda: _check_deletion_in_readme(),
-            "remediation": "Document data deletion process in README or PRIVACY.md"
-        },
-    },
-}
+from typing import Callable, Iterator, NamedTuple
+from datetime import datetime, timezone
+
+
+# Fixed paths the checks look at, built once rather than on every call.
+_SECURITY_PATHS = (Path("SECURITY.md"), Path("docs/security.md"), Path("docs/SECURITY.md"))
+_PRIVACY_PATHS = (Path("PRIVACY.md"), Path("PRIVACY"), Path("docs/PRIVACY.md"), Path(".github/PRIVACY.md"))
+_PR_TEMPLATE = Path(".github/PULL_REQUEST_TEMPLATE.md")
+_GITIGNORE = Path(".gitignore")
+_DELETION_DOCS = (Path("README.md"), Path("PRIVACY.md"), Path("docs/privacy.md"))
+
+
+def _compile_globs(*globs: str) -> re.Pattern:
+    """Join glob patterns into one compiled regex, matched without touching the filesystem."""
+    return re.compile("|".join(fnmatch.translate(g) for g in globs))
+
+
+# Exclusions stay declarative: add a glob here rather than a new filter.
+# Directory names matching _SKIP_DIRS_RE are pruned from the walk; paths
+# matching _SECRET_SKIP_RE are not scanned for secrets (configs such as
+# .env.example are still checked for plain-http URLs).
+_SKIP_DIRS_RE = _compile_globs(
+    ".git", "node_modules", ".venv", "venv", "__pycache__",
+    "dist", "build", ".tox", ".mypy_cache", ".pytest_cache",
+)
+_SECRET_SKIP_RE = _compile_globs("*.env*")
+_CONFIG_EXTS = (".yaml", ".yml", ".json", ".env.example")
+_SECRET_EXTS = (".py", ".js", ".ts", ".sh")
+# One case-insensitive pass per file. "[-]" stops the pattern matching this line.
+_SECRET_RE = re.compile(
+    rb"api_key\s*=|secret\s*=|password\s*=|token\s*=|Bearer\s+sk-|sk-proj[-]", re.IGNORECASE
+)
+_LOCAL_RE = re.compile(rb"localhost|127\.0\.0\.1")
+
+# Files are read in _READ_CHUNK blocks; each block is searched together with
+# the last _READ_OVERLAP bytes of the one before, so a match straddling two
+# blocks is still found without holding the whole file in memory.
+_READ_CHUNK = 1 << 16
+_READ_OVERLAP = 64
+
+
+def _read_windows(path: str) -> Iterator[bytes]:
+    with open(path, "rb", buffering=0) as fh:
+        tail = b""
+        while chunk := fh.read(_READ_CHUNK):
+            window = tail + chunk
+            yield window
+            tail = window[-_READ_OVERLAP:]
+
+
+def _has_insecure_http(path: str) -> bool:
+    """True if the file has an http:// URL and never mentions localhost/127.0.0.1."""
+    seen_http = False
+    for window in _read_windows(path):
+        if _LOCAL_RE.search(window):
+            return False
+        seen_http = seen_http or b"http://" in window
+    return seen_http
+
+
+def _has_secret(path: str) -> bool:
+    return any(_SECRET_RE.search(window) for window in _read_windows(path))
+
+
+# Content checks are I/O bound and independent, so past _POOL_MIN_FILES
+# candidates they fan out to threads (file reads release the GIL).
+_POOL_MIN_FILES = 64
+_POOL_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _safe(check: Callable[[str], bool], path: str) -> bool:
+    try:
+        return check(path)
+    except OSError:
+        return False
+
+
+def _any_file(check: Callable[[str], bool], paths: list[str]) -> bool:
+    """True if check holds for any path; stops at the first hit."""
+    if len(paths) <= _POOL_MIN_FILES:
+        return any(_safe(check, p) for p in paths)
+    ex = ThreadPoolExecutor(max_workers=_POOL_WORKERS)
+    try:
+        return any(ex.map(functools.partial(_safe, check), paths))
+    finally:
+        ex.shutdown(cancel_futures=True)
+
+
+@dataclass
+class _RepoFiles:
+    configs: list[str]
+    sources: list[str]
+    has_privacy_doc: bool
+
+
+def _scan_repo(root: str) -> _RepoFiles:
+    """Walk the tree under root once, collecting what every file-based check needs."""
+    configs, sources = [], []
+    has_privacy_doc = False
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not _SKIP_DIRS_RE.match(d)]
+        has_privacy_doc = has_privacy_doc or any(n.startswith("PRIVACY") for n in dirs + files)
+        for name in files:
+            path = os.path.join(dirpath, name)
+            if name.endswith(_CONFIG_EXTS):
+                configs.append(path)
+            elif name.endswith(_SECRET_EXTS) and not _SECRET_SKIP_RE.match(os.path.relpath(path, root)):
+                sources.append(path)
+    return _RepoFiles(configs, sources, has_privacy_doc)
+
+
+@dataclass
+class _ScanContext:
+    """Findings for one tree; the walk and each content check run once, on first use."""
+    root: str
+
+    @functools.cached_property
+    def files(self) -> _RepoFiles:
+        return _scan_repo(self.root)
+
+    @functools.cached_property
+    def has_http_nonlocal(self) -> bool:
+        return _any_file(_has_insecure_http, self.files.configs)
+
+    @functools.cached_property
+    def has_secret(self) -> bool:
+        return _any_file(_has_secret, self.files.sources)
+
+
+# Set by run_checks so every check in one run shares a single scan; outside
+# a run each call scans afresh rather than reusing stale results.
+_SCAN: ContextVar[_ScanContext] = ContextVar("_SCAN")
+
+
+def _scan_context() -> _ScanContext:
+    try:
+        return _SCAN.get()
+    except LookupError:
+        return _ScanContext(os.getcwd())
 
 
 def _check_https_in_configs() -> bool:
     """Check that no http:// (non-localhost) URLs exist in config files."""
-    for f in Path(".").glob("**/*.{yaml,yml,json,env.example}"):
-        content = f.read_text(errors="ignore")
-        if "http://" in content and "localhost" not in content and "127.0.0.1" not in content:
-            return False
-    return True
+    return not _scan_context().has_http_nonlocal
 
 
 def _check_hardcoded_secrets() -> bool:
     """Check for patterns that look like hardcoded secrets."""
-    patterns = ["api_key =", "secret =", "password =", "token =", "Bearer sk-", "sk-proj-"]
-    for f in Path(".").glob("**/*.{py,js,ts,sh}"):
-        try:
-            content = f.read_text()
-            for p in patterns:
-                if p in content.lower() and ".env" not in str(f):
-                    return True
-        except Exception:
-            pass
-    return False
+    return _scan_context().has_secret
+
+
+def _has_security_policy() -> bool:
+    return any(p.exists() for p in _SECURITY_PATHS)
+
+
+def _has_pr_template() -> bool:
+    return _PR_TEMPLATE.exists()
+
+
+def _has_gitignore() -> bool:
+    return _GITIGNORE.exists()
+
+
+def _no_hardcoded_secrets() -> bool:
+    return not _check_hardcoded_secrets()
+
+
+def _check_privacy_doc() -> bool:
+    """A PRIVACY* file or directory anywhere in the tree; usual locations are stat'ed first."""
+    return any(p.exists() for p in _PRIVACY_PATHS) or _scan_context().files.has_privacy_doc
 
 
 def _check_deletion_in_readme() -> bool:
-    for f in ["README.md", "PRIVACY.md", "docs/privacy.md"]:
-        if Path(f).exists():
-            content = Path(f).read_text(errors="ignore").lower()
+    for f in _DELETION_DOCS:
+        if f.exists():
+            content = f.read_text(errors="ignore").lower()
             if "delet" in content or "remov" in content:
                 return True
     return False
 
 
+class CheckSpec(NamedTuple):
+    framework: str
+    id: str
+    name: str
+    predicate: Callable[[], bool]
+    remediation: str
+
+
+_CHECKS: tuple[CheckSpec, ...] = (
+    CheckSpec(
+        "soc2", "CC1.1", "Security Policy Exists", _has_security_policy,
+        "Create SECURITY.md documenting security policies",
+    ),
+    CheckSpec(
+        "soc2", "CC2.1", "Change Management Process", _has_pr_template,
+        "Add .github/PULL_REQUEST_TEMPLATE.md",
+    ),
+    CheckSpec(
+        "soc2", "CC6.1", "Encryption in Transit", _check_https_in_configs,
+        "Ensure all service URLs use HTTPS",
+    ),
+    CheckSpec(
+        "soc2", "CC6.7", "No Hardcoded Secrets", _no_hardcoded_secrets,
+        "Remove all hardcoded API keys, tokens, passwords",
+    ),
+    CheckSpec(
+        "soc2", "CC7.1", ".gitignore Exists", _has_gitignore,
+        "Create .gitignore with .env, *.key, secrets/",
+    ),
+    CheckSpec(
+        "gdpr", "GDPR-7", "Privacy Policy Linked", _check_privacy_doc,
+        "Add PRIVACY.md or link to privacy policy",
+    ),
+    CheckSpec(
+        "gdpr", "GDPR-17", "Data Deletion Process", _check_deletion_in_readme,
+        "Document data deletion process in README or PRIVACY.md",
+    ),
+)
+
+# The same checks grouped by framework, in declaration order, for callers
+# that want to list or introspect them.
+CHECKS_BY_FRAMEWORK: dict[str, tuple[CheckSpec, ...]] = {
+    fw: tuple(spec for spec in _CHECKS if spec.framework == fw)
+    for fw in dict.fromkeys(spec.framework for spec in _CHECKS)
+}
+
+
 def run_checks(frameworks: list[str] = None) -> dict:
-    results = {"timestamp": datetime.utcnow().isoformat(), "checks": {}, "summary": {}}
-    frameworks = frameworks or list(CHECKS.keys())
+    results = {"timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"), "checks": {}, "summary": {}}
+    frameworks = frameworks or list(CHECKS_BY_FRAMEWORK)
+    selected = set(frameworks)
     
     passed = failed = 0
     
-    for framework in frameworks:
-        if framework not in CHECKS:
-            continue
-        results["checks"][framework] = {}
-        
-        for check_id, check_def in CHECKS[framework].items():
+    # One scan serves every content check in this run.
+    scan_reset = _SCAN.set(_ScanContext(os.getcwd()))
+    try:
+        for spec in _CHECKS:
+            if spec.framework not in selected:
+                continue
+            t0 = time.perf_counter_ns()
             try:
-                ok = check_def["check"]()
-            except Exception as e:
+                ok = spec.predicate()
+            except Exception:
                 ok = False
+            duration_ns = time.perf_counter_ns() - t0
             
-            status = "PASS" if ok else "FAIL"
-            results["checks"][framework][check_id] = {
-                "name": check_def["name"],
-                "status": status,
-                "remediation": check_def["remediation"] if not ok else None,
+            results["checks"].setdefault(spec.framework, {})[spec.id] = {
+                "name": spec.name,
+                "status": "PASS" if ok else "FAIL",
+                "remediation": spec.remediation if not ok else None,
+                # The first content check also pays for the shared tree walk.
+                "duration_ns": duration_ns,
             }
             
             if ok:
                 passed += 1
             else:
                 failed += 1
+    finally:
+        _SCAN.reset(scan_reset)
     
     results["summary"] = {
         "passed": passed,
@@ -123,32 +285,38 @@ def run_checks(frameworks: list[str] = None) -> dict:
     return results
 
 
+_ICONS = {"PASS": "✅", "FAIL": "❌"}
+
+
 def print_report(results: dict):
-    print(f"\n{'='*60}")
-    print(f"BlackRoad Compliance Check — {results['timestamp'][:10]}")
-    print(f"{'='*60}\n")
-    
+    out = [
+        f"\n{'='*60}",
+        f"BlackRoad Compliance Check — {results['timestamp'][:10]}",
+        f"{'='*60}\n",
+    ]
     for framework, checks in results["checks"].items():
-        print(f"[{framework.upper()}]")
+        out.append(f"[{framework.upper()}]")
         for check_id, check in checks.items():
-            icon = "✅" if check["status"] == "PASS" else "❌"
-            print(f"  {icon} {check_id}: {check['name']}")
+            out.append(f"  {_ICONS[check['status']]} {check_id}: {check['name']}")
             if check.get("remediation"):
-                print(f"     → {check['remediation']}")
-        print()
-    
+                out.append(f"     → {check['remediation']}")
+        out.append("")
+
     s = results["summary"]
-    print(f"Score: {s['score']} ({s['passed']}/{s['total']} passed)\n")
+    out.append(f"Score: {s['score']} ({s['passed']}/{s['total']} passed)\n")
+    # Built up front and written once rather than a print() per line.
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":
     import argparse
+    import json
     parser = argparse.ArgumentParser(description="BlackRoad Compliance Checker")
     parser.add_argument("--framework", choices=["soc2", "gdpr", "ccpa", "all"], default="all")
     parser.add_argument("--json", action="store_true")
     args = parser.parse_args()
     
-    frameworks = list(CHECKS.keys()) if args.framework == "all" else [args.framework]
+    frameworks = list(CHECKS_BY_FRAMEWORK) if args.framework == "all" else [args.framework]
     results = run_checks(frameworks)
     
     if args.json: